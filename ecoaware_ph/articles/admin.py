@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Article, Category
+from .models import Article, AuthorStats, Category
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -10,9 +10,16 @@ class CategoryAdmin(admin.ModelAdmin):
 
 @admin.register(Article)
 class ArticleAdmin(admin.ModelAdmin):
-    list_display = ('title', 'author', 'category', 'status', 'views', 'created_at')
-    list_filter = ('status', 'category', 'created_at')
-    search_fields = ('title', 'content')
+    list_display = ('title', 'author', 'category', 'status', 'is_featured', 'featured_rank', 'views', 'created_at')
+    list_filter = ('status', 'is_featured', 'category', 'created_at')
+    list_editable = ('is_featured', 'featured_rank')
+    # Body text is searched through the full-text index, not icontains on HTML
+    search_fields = ('title', 'excerpt')
     prepopulated_fields = {'slug': ('title',)}
 
-    date_hierarchy = 'created_at'
\ No newline at end of file
+    date_hierarchy = 'created_at'
+
+@admin.register(AuthorStats)
+class AuthorStatsAdmin(admin.ModelAdmin):
+    list_display = ('author', 'article_count', 'total_views', 'updated_at')
+    readonly_fields = ('author', 'article_count', 'total_views', 'updated_at')
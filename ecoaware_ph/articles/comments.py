@@ -0,0 +1,54 @@
+from collections import defaultdict
+
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .pagination import paginate_keyset
+
+
+# =========================================================
+# COMMENT THREADS
+# =========================================================
+# Top-level comments are paged newest-first with keyset cursors; the
+# replies for just the comments on a page are fetched in one extra query.
+
+COMMENTS_PER_PAGE = 10
+
+
+def comment_page(article, cursor=None, per_page=COMMENTS_PER_PAGE):
+    from .models import Comment
+
+    top_level = (
+        Comment.objects
+        .filter(article=article, is_active=True, parent__isnull=True)
+        .select_related('author')
+    )
+    page = paginate_keyset(top_level, cursor=cursor, per_page=per_page)
+
+    replies = defaultdict(list)
+    if page.object_list:
+        reply_rows = (
+            Comment.objects
+            .filter(parent__in=[comment.pk for comment in page], is_active=True)
+            .select_related('author')
+            .order_by('created_at', 'id')
+        )
+        for reply in reply_rows:
+            replies[reply.parent_id].append(reply)
+    for comment in page:
+        comment.thread_replies = replies[comment.pk]
+    return page
+
+
+def refresh_comment_count(article_id):
+    """Store the number of active comments (replies included) on the article."""
+    from .models import Article, Comment
+
+    counts = (
+        Comment.objects.filter(article_id=OuterRef('pk'), is_active=True)
+        .order_by()
+        .values('article_id')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    Article.objects.filter(pk=article_id).update(comment_count=Coalesce(Subquery(counts), 0))
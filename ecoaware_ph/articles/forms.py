@@ -9,7 +9,7 @@ class ArticleForm(forms.ModelForm):
     class Meta:
         model = Article
         # Author, slug, views, timestamps are excluded (set automatically)
-        fields = ['title', 'content', 'excerpt', 'featured_image', 'category', 'status']
+        fields = ['title', 'content', 'excerpt', 'featured_image', 'category', 'status', 'is_featured', 'featured_rank']
         widgets = {
             'title': forms.TextInput(attrs={
                 'class': 'form-control',
@@ -30,6 +30,17 @@ class ArticleForm(forms.ModelForm):
             'status': forms.Select(attrs={
                 'class': 'form-select',
             }),
+            'is_featured': forms.CheckboxInput(attrs={
+                'class': 'form-check-input',
+            }),
+            'featured_rank': forms.NumberInput(attrs={
+                'class': 'form-control',
+                'min': 0,
+            }),
+        }
+        help_texts = {
+            'is_featured': 'Show this article in the homepage Featured section',
+            'featured_rank': 'Lower numbers appear first',
         }
 
 
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from articles.models import Article, ArticleSearchIndex
+from articles import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index from all published articles'
+
+    def handle(self, *args, **options):
+        for article_id in ArticleSearchIndex.objects.values_list('article_id', flat=True).iterator():
+            search.remove_article(article_id)
+
+        count = 0
+        for article in Article.objects.filter(status='PUBLISHED').iterator(chunk_size=500):
+            search.index_article(article)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} published articles.'))
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_author_stats(apps, schema_editor):
+    Article = apps.get_model('articles', 'Article')
+    AuthorStats = apps.get_model('articles', 'AuthorStats')
+    totals = (
+        Article.objects.values('author_id')
+        .annotate(article_count=models.Count('id'), total_views=models.Sum('views'))
+        .order_by()
+    )
+    AuthorStats.objects.bulk_create([
+        AuthorStats(
+            author_id=row['author_id'],
+            article_count=row['article_count'],
+            total_views=row['total_views'] or 0,
+        )
+        for row in totals
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0004_remove_article_tags_delete_tag'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='author_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('article_count', models.PositiveIntegerField(default=0)),
+                ('total_views', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Author stats',
+            },
+        ),
+        migrations.RunPython(backfill_author_stats, migrations.RunPython.noop),
+    ]
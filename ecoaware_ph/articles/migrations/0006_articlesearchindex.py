@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:08
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+FTS_TABLE = 'articles_search_fts'
+INDEX_TABLE = 'articles_articlesearchindex'
+
+
+def create_backend_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX articles_search_vector_gin ON {INDEX_TABLE} USING gin (search_vector)'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            f"title, excerpt, body, tokenize='porter unicode61 remove_diacritics 2')"
+        )
+
+
+def drop_backend_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS articles_search_vector_gin')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def backfill_search_index(apps, schema_editor):
+    from articles.search import strip_html
+
+    Article = apps.get_model('articles', 'Article')
+    ArticleSearchIndex = apps.get_model('articles', 'ArticleSearchIndex')
+    published = Article.objects.filter(status='PUBLISHED').only('id', 'title', 'excerpt', 'content')
+    ArticleSearchIndex.objects.bulk_create(
+        (
+            ArticleSearchIndex(
+                article_id=article.pk,
+                title=article.title,
+                excerpt=strip_html(article.excerpt),
+                body=strip_html(article.content),
+            )
+            for article in published.iterator(chunk_size=500)
+        ),
+        batch_size=500,
+    )
+
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            f"UPDATE {INDEX_TABLE} SET search_vector = "
+            f"setweight(to_tsvector('english', title), 'A') || "
+            f"setweight(to_tsvector('english', excerpt), 'B') || "
+            f"setweight(to_tsvector('english', body), 'C')"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, excerpt, body) '
+            f'SELECT article_id, title, excerpt, body FROM {INDEX_TABLE}'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0005_authorstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleSearchIndex',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_index', serialize=False, to='articles.article')),
+                ('title', models.CharField(max_length=200)),
+                ('excerpt', models.TextField(blank=True)),
+                ('body', models.TextField(blank=True)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(create_backend_index, drop_backend_index),
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
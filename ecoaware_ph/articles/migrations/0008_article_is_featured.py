@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0007_article_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='featured_rank',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='is_featured',
+            field=models.BooleanField(default=False),
+        ),
+    ]
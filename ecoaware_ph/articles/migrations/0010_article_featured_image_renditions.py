@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0009_comment_threads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='featured_image_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
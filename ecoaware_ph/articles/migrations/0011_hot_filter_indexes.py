@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0010_article_featured_image_renditions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['category', 'created_at', 'id'], name='article_category_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['author', 'created_at'], name='article_author_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('status', 'PUBLISHED')), fields=['created_at'], name='article_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('is_featured', True), ('status', 'PUBLISHED')), fields=['featured_rank', '-created_at'], name='article_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('is_active', True), ('parent__isnull', True)), fields=['article', 'created_at', 'id'], name='comment_article_thread_idx'),
+        ),
+    ]
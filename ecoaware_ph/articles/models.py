@@ -2,6 +2,8 @@ from django.db import models
 from django.conf import settings
 from django.utils.text import slugify
 from django.urls import reverse
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models.functions import Substr
 from django_ckeditor_5.fields import CKEditor5Field  # CKEditor 5 field
 
 
@@ -27,6 +29,25 @@ class Category(models.Model):
         return self.name
 
 
+# =========================================================
+# ARTICLE QUERYSET
+# =========================================================
+class ArticleQuerySet(models.QuerySet):
+    # Enough of the body to fall back on when an article has no excerpt
+    PREVIEW_LENGTH = 600
+
+    def for_listing(self):
+        """Card lists: related rows joined in, heavy HTML body left behind."""
+        return (
+            self.select_related('author', 'category')
+            .defer('content')
+            .annotate(content_preview=Substr('content', 1, self.PREVIEW_LENGTH))
+        )
+
+    def for_detail(self):
+        return self.select_related('author', 'category')
+
+
 # =========================================================
 # ARTICLE MODEL
 # =========================================================
@@ -42,6 +63,8 @@ class Article(models.Model):
     content = CKEditor5Field('Content', config_name='extends')  # CKEditor 5
     excerpt = models.TextField(max_length=500, blank=True, null=True)
     featured_image = models.ImageField(upload_to='articles/', blank=True, null=True)
+    # Resized derivatives of featured_image, filled in by core.images
+    featured_image_renditions = models.JSONField(default=dict, blank=True, editable=False)
 
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, related_name='articles')
 
@@ -50,11 +73,36 @@ class Article(models.Model):
 
     views = models.PositiveIntegerField(default=0)
 
+    # Homepage placement; lower ranks show first
+    is_featured = models.BooleanField(default=False)
+    featured_rank = models.PositiveSmallIntegerField(default=0)
+
+    # Active comments including replies, maintained by articles.signals
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ArticleQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination walks (created_at, id) in either direction
+            models.Index(fields=['created_at', 'id'], name='article_created_id_idx'),
+            # The listing filtered by category, and an author's own articles
+            models.Index(fields=['category', 'created_at', 'id'], name='article_category_created_idx'),
+            models.Index(fields=['author', 'created_at'], name='article_author_created_idx'),
+            # Published-only reads (home feed, EcoBot) skip drafts and archives entirely
+            models.Index(
+                fields=['created_at'], name='article_published_idx',
+                condition=models.Q(status='PUBLISHED'),
+            ),
+            models.Index(
+                fields=['featured_rank', '-created_at'], name='article_featured_idx',
+                condition=models.Q(status='PUBLISHED', is_featured=True),
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -83,6 +131,8 @@ class Article(models.Model):
 class Comment(models.Model):
     article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    # Replies are one level deep: a reply's parent is always a top-level comment
+    parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='replies')
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -90,6 +140,94 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # One bounded range scan per page of an article's comments
+            models.Index(fields=['article', 'is_active', 'created_at'], name='comment_article_active_idx'),
+            # A page of an article's top-level thread, already in display order
+            models.Index(
+                fields=['article', 'created_at', 'id'], name='comment_article_thread_idx',
+                condition=models.Q(is_active=True, parent__isnull=True),
+            ),
+        ]
 
     def __str__(self):
         return f'Comment by {self.author} on {self.article}'
+
+
+# =========================================================
+# SEARCH INDEX MODEL
+# =========================================================
+class ArticleSearchIndex(models.Model):
+    """
+    Plain-text copy of a published article used by articles.search.
+    ``search_vector`` is only populated on PostgreSQL (GIN indexed there);
+    on SQLite the text is mirrored into an FTS5 table instead.
+    """
+    article = models.OneToOneField(
+        Article, on_delete=models.CASCADE, primary_key=True, related_name='search_index'
+    )
+    title = models.CharField(max_length=200)
+    excerpt = models.TextField(blank=True)
+    body = models.TextField(blank=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.title
+
+
+# =========================================================
+# AUTHOR STATS MODEL
+# =========================================================
+class AuthorStats(models.Model):
+    """
+    Denormalized per-author totals, kept up to date from article
+    saves/deletes (see articles.signals) and from view counter flushes.
+    """
+    author = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+        primary_key=True, related_name='author_stats'
+    )
+    article_count = models.PositiveIntegerField(default=0)
+    total_views = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Author stats'
+
+    def __str__(self):
+        return f'Stats for {self.author_id}'
+
+    @property
+    def impact_points(self):
+        return self.total_views + self.article_count
+
+    @classmethod
+    def for_author(cls, author):
+        """Stats row for an author, or an unsaved zeroed row if they have none."""
+        stats = cls.objects.filter(author=author).first()
+        return stats or cls(author=author)
+
+    @classmethod
+    def adjust(cls, author_id, articles=0, views=0):
+        """Atomically add deltas to an author's counters, creating the row if needed."""
+        cls.objects.get_or_create(author_id=author_id)
+        cls.objects.filter(author_id=author_id).update(
+            article_count=models.F('article_count') + articles,
+            total_views=models.F('total_views') + views,
+        )
+
+    @classmethod
+    def recompute(cls, author_id):
+        """Rebuild one author's row from the articles table."""
+        totals = Article.objects.filter(author_id=author_id).aggregate(
+            article_count=models.Count('id'),
+            total_views=models.Sum('views'),
+        )
+        cls.objects.update_or_create(
+            author_id=author_id,
+            defaults={
+                'article_count': totals['article_count'],
+                'total_views': totals['total_views'] or 0,
+            },
+        )
@@ -0,0 +1,138 @@
+import base64
+import json
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+# =========================================================
+# KEYSET (CURSOR) PAGINATION
+# =========================================================
+# Pages are addressed by the (created_at, id) of their boundary row
+# rather than an OFFSET, so every page costs one indexed range scan and
+# no COUNT(*). Cursors are opaque, URL-safe tokens.
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(obj, direction):
+    payload = {'c': obj.created_at.isoformat(), 'i': obj.pk, 'd': direction}
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = parse_datetime(payload['c'])
+        pk = int(payload['i'])
+        direction = payload['d']
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor(token)
+    if created_at is None or direction not in ('next', 'prev'):
+        raise InvalidCursor(token)
+    return created_at, pk, direction
+
+
+class KeysetPage:
+    """One page of results; iterable like a list so templates can loop over it."""
+
+    def __init__(self, object_list, next_cursor=None, prev_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+def paginate_keyset(queryset, cursor=None, per_page=9):
+    """
+    Newest-first page of ``queryset`` ordered by (-created_at, -id).
+
+    ``cursor`` is a token from a previous page's ``next_cursor`` or
+    ``prev_cursor``; an invalid or missing cursor yields the first page.
+    """
+    direction = 'next'
+    if cursor:
+        try:
+            created_at, pk, direction = decode_cursor(cursor)
+        except InvalidCursor:
+            cursor = None
+
+    if not cursor:
+        rows = list(queryset.order_by('-created_at', '-id')[:per_page + 1])
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        return KeysetPage(
+            rows,
+            next_cursor=encode_cursor(rows[-1], 'next') if has_more else None,
+        )
+
+    if direction == 'next':
+        rows = list(
+            queryset
+            .filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+            .order_by('-created_at', '-id')[:per_page + 1]
+        )
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        return KeysetPage(
+            rows,
+            next_cursor=encode_cursor(rows[-1], 'next') if has_more else None,
+            prev_cursor=encode_cursor(rows[0], 'prev') if rows else None,
+        )
+
+    # Walking backwards: scan ascending from the boundary, then flip
+    rows = list(
+        queryset
+        .filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+        .order_by('created_at', 'id')[:per_page + 1]
+    )
+    has_more = len(rows) > per_page
+    rows = rows[:per_page][::-1]
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor(rows[-1], 'next') if rows else None,
+        prev_cursor=encode_cursor(rows[0], 'prev') if has_more else None,
+    )
+
+
+def approximate_count(queryset):
+    """
+    Cheap row-count estimate. On PostgreSQL this reads the planner's
+    estimate instead of running COUNT(*); elsewhere it falls back to an
+    exact count.
+    """
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
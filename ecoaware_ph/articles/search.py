@@ -0,0 +1,187 @@
+import html
+import re
+
+from django.db import connection
+from django.utils.html import escape, strip_tags
+from django.utils.safestring import mark_safe
+
+
+# =========================================================
+# FULL-TEXT SEARCH
+# =========================================================
+# Published articles are mirrored into ArticleSearchIndex as plain text
+# (title, excerpt, stripped body). The ranked query runs against:
+#   - PostgreSQL: a weighted tsvector column with a GIN index
+#   - SQLite:     an FTS5 virtual table (articles_search_fts)
+#   - anything else: icontains over the stripped text, unranked
+
+FTS_TABLE = 'articles_search_fts'
+SEARCH_CONFIG = 'english'
+
+# Highlight markers that cannot appear in escaped text; swapped for <mark>
+# only after the snippet has been HTML-escaped.
+_MARK_START = '\x02'
+_MARK_STOP = '\x03'
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def strip_html(value):
+    """Reduce CKEditor HTML to a single line of plain text"""
+    text = html.unescape(strip_tags(value or ''))
+    return ' '.join(text.split())
+
+
+def _render_highlight(snippet):
+    safe = escape(snippet or '')
+    return mark_safe(safe.replace(_MARK_START, '<mark>').replace(_MARK_STOP, '</mark>'))
+
+
+def _fts5_query(query):
+    """Quote every term so user input can't inject FTS5 syntax; terms are ANDed."""
+    terms = _WORD_RE.findall(query)
+    return ' '.join('"%s"*' % term.replace('"', '""') for term in terms)
+
+
+# =========================================================
+# INDEX MAINTENANCE
+# =========================================================
+def index_article(article):
+    """Add or refresh an article in the index; drafts/archived are removed."""
+    from .models import ArticleSearchIndex
+
+    if article.status != 'PUBLISHED':
+        remove_article(article.pk)
+        return None
+
+    entry, _ = ArticleSearchIndex.objects.update_or_create(
+        article_id=article.pk,
+        defaults={
+            'title': article.title,
+            'excerpt': strip_html(article.excerpt),
+            'body': strip_html(article.content),
+        },
+    )
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchVector
+        ArticleSearchIndex.objects.filter(pk=entry.pk).update(
+            search_vector=(
+                SearchVector('title', weight='A', config=SEARCH_CONFIG)
+                + SearchVector('excerpt', weight='B', config=SEARCH_CONFIG)
+                + SearchVector('body', weight='C', config=SEARCH_CONFIG)
+            )
+        )
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [entry.pk])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, excerpt, body) VALUES (%s, %s, %s, %s)',
+                [entry.pk, entry.title, entry.excerpt, entry.body],
+            )
+    return entry
+
+
+def remove_article(article_id):
+    from .models import ArticleSearchIndex
+
+    ArticleSearchIndex.objects.filter(article_id=article_id).delete()
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [article_id])
+
+
+# =========================================================
+# QUERYING
+# =========================================================
+def search_articles(query, page=1, per_page=10):
+    """
+    Ranked search over published articles.
+
+    Returns ``(results, has_next)`` where each result is an Article with
+    ``search_rank`` and ``search_highlight`` attached. One extra row is
+    fetched instead of a COUNT to decide whether a next page exists.
+    """
+    query = (query or '').strip()
+    if not query:
+        return [], False
+
+    offset = (max(page, 1) - 1) * per_page
+    limit = per_page + 1
+
+    if connection.vendor == 'postgresql':
+        hits = _search_postgres(query, offset, limit)
+    elif connection.vendor == 'sqlite':
+        hits = _search_sqlite(query, offset, limit)
+    else:
+        hits = _search_fallback(query, offset, limit)
+
+    has_next = len(hits) > per_page
+    hits = hits[:per_page]
+    return _attach_articles(hits), has_next
+
+
+def _search_postgres(query, offset, limit):
+    from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+    from django.db.models import F
+    from .models import ArticleSearchIndex
+
+    search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+    rows = (
+        ArticleSearchIndex.objects
+        .filter(search_vector=search_query)
+        .annotate(
+            rank=SearchRank(F('search_vector'), search_query),
+            headline=SearchHeadline(
+                'body', search_query, config=SEARCH_CONFIG,
+                start_sel=_MARK_START, stop_sel=_MARK_STOP, max_words=35, min_words=15,
+            ),
+        )
+        .order_by('-rank', '-article_id')
+        .values_list('article_id', 'rank', 'headline')[offset:offset + limit]
+    )
+    return list(rows)
+
+
+def _search_sqlite(query, offset, limit):
+    match = _fts5_query(query)
+    if not match:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid, bm25({FTS_TABLE}, 10.0, 4.0, 1.0) AS rank, '
+            f"snippet({FTS_TABLE}, 2, %s, %s, '…', 32) "
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY rank LIMIT %s OFFSET %s',
+            [_MARK_START, _MARK_STOP, match, limit, offset],
+        )
+        # bm25() is lower-is-better; flip it so callers always sort descending
+        return [(article_id, -rank, snippet) for article_id, rank, snippet in cursor.fetchall()]
+
+
+def _search_fallback(query, offset, limit):
+    from django.db.models import Q
+    from .models import ArticleSearchIndex
+
+    rows = (
+        ArticleSearchIndex.objects
+        .filter(Q(title__icontains=query) | Q(excerpt__icontains=query) | Q(body__icontains=query))
+        .order_by('-article_id')
+        .values_list('article_id', 'body')[offset:offset + limit]
+    )
+    return [(article_id, 0.0, body[:200]) for article_id, body in rows]
+
+
+def _attach_articles(hits):
+    from .models import Article
+
+    ids = [article_id for article_id, _, _ in hits]
+    articles = Article.objects.filter(pk__in=ids).select_related('author', 'category').defer('content').in_bulk()
+    results = []
+    for article_id, rank, snippet in hits:
+        article = articles.get(article_id)
+        if article is None:
+            continue
+        article.search_rank = rank
+        article.search_highlight = _render_highlight(snippet)
+        results.append(article)
+    return results
@@ -0,0 +1,71 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Article, AuthorStats, Comment
+from . import search
+from .comments import refresh_comment_count
+from .tasks import recompute_author_stats
+
+
+# =========================================================
+# AUTHOR STATS MAINTENANCE
+# =========================================================
+@receiver(pre_save, sender=Article)
+def remember_previous_author(sender, instance, **kwargs):
+    """Stash the stored author so a reassignment can be detected after save"""
+    if instance.pk:
+        instance._previous_author_id = (
+            Article.objects.filter(pk=instance.pk).values_list('author_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Article)
+def update_author_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    if created:
+        AuthorStats.adjust(instance.author_id, articles=1, views=instance.views)
+        return
+
+    previous_author_id = getattr(instance, '_previous_author_id', None)
+    if previous_author_id and previous_author_id != instance.author_id:
+        # Full recounts scan both authors' articles; let the worker do it
+        recompute_author_stats.enqueue(previous_author_id)
+        recompute_author_stats.enqueue(instance.author_id)
+
+
+@receiver(post_delete, sender=Article)
+def update_author_stats_on_delete(sender, instance, **kwargs):
+    AuthorStats.objects.filter(author_id=instance.author_id).update(
+        article_count=Greatest(F('article_count') - 1, 0),
+        total_views=Greatest(F('total_views') - instance.views, 0),
+    )
+
+
+# =========================================================
+# SEARCH INDEX MAINTENANCE
+# =========================================================
+@receiver(post_save, sender=Article)
+def update_search_index_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    # View count flushes and other counter-only saves don't touch indexed text
+    if raw or (update_fields and not {'title', 'excerpt', 'content', 'status'} & set(update_fields)):
+        return
+    search.index_article(instance)
+
+
+@receiver(post_delete, sender=Article)
+def update_search_index_on_delete(sender, instance, **kwargs):
+    search.remove_article(instance.pk)
+
+
+# =========================================================
+# COMMENT COUNT MAINTENANCE
+# =========================================================
+@receiver([post_save, post_delete], sender=Comment)
+def update_comment_count(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_comment_count(instance.article_id)
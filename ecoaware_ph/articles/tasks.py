@@ -0,0 +1,19 @@
+from core.analytics import record_at
+from core.jobs import task
+
+from .models import AuthorStats
+from .view_counter import apply_view_counts
+
+
+# =========================================================
+# BACKGROUND JOBS (run by `manage.py runworker`)
+# =========================================================
+@task(priority=10, max_attempts=5)
+def flush_view_counts(pairs, recorded_at=None):
+    """Apply ``[[article_id, hits], ...]`` drained from a web process's view counter at ``recorded_at``"""
+    return apply_view_counts({int(article_id): hits for article_id, hits in pairs}, record_at(recorded_at))
+
+
+@task(priority=150)
+def recompute_author_stats(author_id):
+    AuthorStats.recompute(author_id)
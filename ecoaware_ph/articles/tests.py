@@ -1,3 +1,359 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.jobs import Worker
+from core.models import Job
+
+from . import comments, tasks
+from .models import Article, AuthorStats, Category, Comment
+from .pagination import paginate_keyset
+from .search import search_articles
+from .view_counter import ViewCounter, apply_view_counts, record_view, view_counter
+
+
+class ViewCounterTests(TestCase):
+    def setUp(self):
+        self.author = get_user_model().objects.create_user('writer', password='pw')
+        self.article = Article.objects.create(title='Clean Air', content='<p>Body</p>', author=self.author)
+        self.counter = ViewCounter()
+        # Flush by hand; no background thread
+        patcher = mock.patch.object(self.counter, '_ensure_flusher')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def views(self):
+        return Article.objects.values_list('views', flat=True).get(pk=self.article.pk)
+
+    def test_hits_are_buffered_then_applied_in_one_job(self):
+        for _ in range(3):
+            self.counter.record(self.article.pk)
+        self.assertEqual(self.counter.pending(self.article.pk), 3)
+        self.assertEqual(self.views(), 0)
+
+        self.assertEqual(self.counter.flush(), 1)
+        self.assertEqual(self.counter.pending(self.article.pk), 0)
+        self.assertEqual(Job.objects.filter(name=tasks.flush_view_counts.name).count(), 1)
+        Worker(sleep=0).run(burst=True)
+        self.assertEqual(self.views(), 3)
+        self.assertEqual(self.counter.flush(), 0)
+
+    @override_settings(VIEW_COUNTER_MAX_PENDING=5)
+    def test_flushes_early_when_the_buffer_fills(self):
+        self.counter.record(self.article.pk, hits=4)
+        self.assertFalse(Job.objects.filter(name=tasks.flush_view_counts.name).exists())
+        self.counter.record(self.article.pk)
+        self.assertEqual(self.counter.pending(self.article.pk), 0)
+        self.assertTrue(Job.objects.filter(name=tasks.flush_view_counts.name).exists())
+
+    def test_failed_flush_keeps_the_hits(self):
+        self.counter.record(self.article.pk, hits=2)
+        with mock.patch.object(tasks.flush_view_counts, 'enqueue', side_effect=RuntimeError('queue down')), \
+                self.assertLogs('articles.view_counter', 'ERROR'):
+            self.assertEqual(self.counter.flush(), 0)
+        self.assertEqual(self.counter.pending(self.article.pk), 2)
+
+    @mock.patch.object(view_counter, '_ensure_flusher')
+    def test_page_shows_buffered_views(self, ensure_flusher):
+        self.addCleanup(view_counter.drain)
+        view_counter.record(self.article.pk, hits=2)
+        self.assertEqual(record_view(self.article).views, 3)
+        self.assertEqual(self.views(), 0)
+
+
+class AuthorStatsTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.writer = User.objects.create_user('writer', password='pw')
+        self.other = User.objects.create_user('other', password='pw')
+
+    def stats(self, user):
+        return AuthorStats.for_author(user)
+
+    def test_follows_articles_and_views(self):
+        # No row yet: a zeroed, unsaved one
+        self.assertEqual(self.stats(self.writer).article_count, 0)
+        self.assertFalse(AuthorStats.objects.exists())
+        first = Article.objects.create(title='Compost 101', content='-', author=self.writer)
+        second = Article.objects.create(title='Solar Roofs', content='-', author=self.writer)
+        apply_view_counts({first.pk: 5, second.pk: 2})
+
+        stats = self.stats(self.writer)
+        self.assertEqual((stats.article_count, stats.total_views, stats.impact_points), (2, 7, 9))
+
+        first.refresh_from_db()
+        first.delete()
+        stats = self.stats(self.writer)
+        self.assertEqual((stats.article_count, stats.total_views), (1, 2))
+
+    def test_reassigned_article_is_recounted_by_the_worker(self):
+        article = Article.objects.create(title='Bike Lanes', content='-', author=self.writer)
+        apply_view_counts({article.pk: 4})
+        article.refresh_from_db()
+        article.author = self.other
+        article.save()
+        Worker(sleep=0).run(burst=True)
+
+        self.assertEqual((self.stats(self.writer).article_count, self.stats(self.writer).total_views), (0, 0))
+        self.assertEqual((self.stats(self.other).article_count, self.stats(self.other).total_views), (1, 4))
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.author = get_user_model().objects.create_user('writer', password='pw')
+        self.client.force_login(self.author)
+
+    def publish(self, title, content, status='PUBLISHED'):
+        return Article.objects.create(title=title, content=content, author=self.author, status=status)
+
+    def test_title_matches_rank_first_and_drafts_are_left_out(self):
+        in_body = self.publish('Weekend Plans', '<p>We planted <b>mangroves</b> along the bay.</p>')
+        in_title = self.publish('Mangroves Protect Coasts', '<p>Roots hold the shore.</p>')
+        self.publish('Mangrove Draft', '<p>Mangroves everywhere</p>', status='DRAFT')
+
+        results, has_next = search_articles('mangroves')
+        self.assertEqual([article.pk for article in results], [in_title.pk, in_body.pk])
+        self.assertFalse(has_next)
+        self.assertIn('<mark>', str(results[1].search_highlight))
+        self.assertNotIn('<b>', str(results[1].search_highlight))
+
+        in_title.status = 'ARCHIVED'
+        in_title.save()
+        self.assertEqual([article.pk for article in search_articles('mangroves')[0]], [in_body.pk])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.publish('Rain "Gardens"', '<p>Catch water OR runoff</p>')
+        for query in ['rain AND', '"gardens', 'NEAR(rain', '-- *', '']:
+            with self.subTest(query=query):
+                search_articles(query)
+
+    def test_api_pages_results(self):
+        for number in range(3):
+            self.publish(f'Tree Planting {number}', '<p>Trees</p>')
+        url = reverse('articles:article_search_api')
+        data = self.client.get(url, {'q': 'tree'}).json()
+        self.assertEqual((len(data['results']), data['has_next']), (3, False))
+        with mock.patch('articles.views.SEARCH_PAGE_SIZE', 2):
+            first = self.client.get(url, {'q': 'tree'}).json()
+            second = self.client.get(url, {'q': 'tree', 'page': 2}).json()
+        self.assertTrue(first['has_next'])
+        self.assertEqual(len(first['results']) + len(second['results']), 3)
+        self.assertFalse(second['has_next'])
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        author = get_user_model().objects.create_user('writer', password='pw')
+        now = timezone.now()
+        for number in range(7):
+            article = Article.objects.create(title=f'Story {number}', content='-', author=author)
+            # Pairs share a timestamp, so the id has to break ties
+            Article.objects.filter(pk=article.pk).update(created_at=now - timedelta(minutes=number // 2))
+        self.newest_first = list(Article.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+        self.client.force_login(author)
+
+    def pks(self, page):
+        return [article.pk for article in page]
+
+    def test_walks_forward_and_back_without_gaps(self):
+        queryset = Article.objects.all()
+        first = paginate_keyset(queryset, per_page=3)
+        second = paginate_keyset(queryset, cursor=first.next_cursor, per_page=3)
+        third = paginate_keyset(queryset, cursor=second.next_cursor, per_page=3)
+        self.assertEqual(self.pks(first) + self.pks(second) + self.pks(third), self.newest_first)
+        self.assertFalse(first.has_previous)
+        self.assertFalse(third.has_next)
+
+        back = paginate_keyset(queryset, cursor=third.prev_cursor, per_page=3)
+        self.assertEqual(self.pks(back), self.pks(second))
+        back = paginate_keyset(queryset, cursor=back.prev_cursor, per_page=3)
+        self.assertEqual(self.pks(back), self.pks(first))
+        self.assertFalse(back.has_previous)
+
+    def test_bad_cursor_means_the_first_page(self):
+        page = paginate_keyset(Article.objects.all(), cursor='not-a-cursor', per_page=3)
+        self.assertEqual(self.pks(page), self.newest_first[:3])
+
+    def test_list_pages_by_cursor_without_counting(self):
+        url = reverse('articles:article_list_api')
+        with mock.patch('articles.views.ARTICLES_PER_PAGE', 4):
+            first = self.client.get(url).json()
+            second = self.client.get(url, {'cursor': first['next_cursor']}).json()
+        titles = [result['title'] for result in first['results'] + second['results']]
+        self.assertEqual(titles, [Article.objects.get(pk=pk).title for pk in self.newest_first])
+        self.assertIsNone(second['next_cursor'])
+        self.assertNotIn('approximate_total', first)
+
+        with self.assertNumQueries(4):
+            # Session, user, the page, and the opt-in total
+            data = self.client.get(url, {'total': 1}).json()
+        self.assertEqual(data['approximate_total'], 7)
+
+
+class QueryCountTests(TestCase):
+    """Page query counts must not grow with the number of articles, authors or comments."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(view_counter.drain)
+        self.reader = get_user_model().objects.create_user('reader', password='pw')
+        self.client.force_login(self.reader)
+        self.article = self.add_articles(1)[0]
+
+    def add_articles(self, count):
+        User = get_user_model()
+        articles = []
+        for _ in range(count):
+            number = Article.objects.count()
+            author = User.objects.create_user(f'author{number}', password='pw')
+            category = Category.objects.create(name=f'Topic {number}')
+            articles.append(Article.objects.create(
+                title=f'Story {number}', content='<p>Body</p>', author=author, category=category, status='PUBLISHED',
+            ))
+        return articles
+
+    def queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(captured)
+
+    def test_article_list(self):
+        url = reverse('articles:article_list')
+        few = self.queries(url)
+        self.add_articles(6)
+        self.assertEqual(self.queries(url), few)
+
+    def test_article_detail(self):
+        url = self.article.get_absolute_url()
+        Comment.objects.create(article=self.article, author=self.reader, content='First')
+        few = self.queries(url)
+        User = get_user_model()
+        for number in range(5):
+            commenter = User.objects.create_user(f'commenter{number}', password='pw')
+            parent = Comment.objects.create(article=self.article, author=commenter, content=f'Comment {number}')
+            Comment.objects.create(article=self.article, author=self.reader, parent=parent, content='Reply')
+        self.assertEqual(self.queries(url), few)
+
+
+class CommentThreadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(view_counter.drain)
+        self.reader = get_user_model().objects.create_user('reader', password='pw')
+        self.article = Article.objects.create(
+            title='Plastic Free July', content='<p>Body</p>', author=self.reader, status='PUBLISHED',
+        )
+        self.client.force_login(self.reader)
+
+    def comment(self, content, parent=None, **fields):
+        return Comment.objects.create(article=self.article, author=self.reader, content=content, parent=parent, **fields)
+
+    def count(self):
+        return Article.objects.values_list('comment_count', flat=True).get(pk=self.article.pk)
+
+    def test_pages_top_level_comments_with_their_replies(self):
+        first = self.comment('First')
+        self.comment('Hidden', is_active=False)
+        self.comment('Second')
+        self.comment('Reply to first', parent=first)
+        self.comment('Removed reply', parent=first, is_active=False)
+        self.comment('Third')
+
+        with self.assertNumQueries(2):
+            page = comments.comment_page(self.article, per_page=2)
+            self.assertEqual([comment.content for comment in page], ['Third', 'Second'])
+        rest = comments.comment_page(self.article, cursor=page.next_cursor, per_page=2)
+        self.assertEqual([comment.pk for comment in rest], [first.pk])
+        self.assertEqual([reply.content for reply in rest.object_list[0].thread_replies], ['Reply to first'])
+        self.assertEqual(page.object_list[0].thread_replies, [])
+        self.assertFalse(rest.has_next)
+        # Active comments, replies included
+        self.assertEqual(self.count(), 4)
+
+    def test_replies_attach_to_top_level_comments_only(self):
+        top = self.comment('Top')
+        reply = self.comment('Reply', parent=top)
+        url = self.article.get_absolute_url()
+        self.client.post(url, {'content': 'Answer', 'parent': top.pk})
+        self.client.post(url, {'content': 'Nested', 'parent': reply.pk})
+        self.assertEqual(Comment.objects.get(content='Answer').parent_id, top.pk)
+        self.assertIsNone(Comment.objects.get(content='Nested').parent_id)
+        self.assertEqual(self.count(), 4)
+
+        self.client.post(reverse('articles:comment_delete', args=[top.pk]))
+        self.assertEqual(self.count(), 1)
+
+    def test_load_more(self):
+        for number in range(comments.COMMENTS_PER_PAGE + 2):
+            self.comment(f'Comment {number}')
+        url = reverse('articles:comment_list_api', args=[self.article.slug])
+        first = self.client.get(url).json()
+        second = self.client.get(url, {'cursor': first['next_cursor']}).json()
+        self.assertEqual(len(first['comments']), comments.COMMENTS_PER_PAGE)
+        self.assertEqual([comment['content'] for comment in second['comments']], ['Comment 1', 'Comment 0'])
+        self.assertIsNone(second['next_cursor'])
+        self.assertIn('Comment 1', second['html'])
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(view_counter.drain)
+        self.reader = get_user_model().objects.create_user('reader', password='pw')
+        self.article = Article.objects.create(
+            title='Saving the Reef', content='<p>Body</p>', author=self.reader, status='PUBLISHED',
+        )
+        self.client.force_login(self.reader)
+
+    def get(self, **headers):
+        return self.client.get(self.article.get_absolute_url(), headers=headers)
+
+    def test_revisit_is_not_modified_until_comments_change(self):
+        first = self.get()
+        self.assertEqual(self.get(if_none_match=first['ETag']).status_code, 304)
+
+        Comment.objects.create(article=self.article, author=self.reader, content='Older')
+        newest = Comment.objects.create(article=self.article, author=self.reader, content='Newest')
+        seen = self.get()
+        self.assertNotEqual(seen['ETag'], first['ETag'])
+
+        # Hiding the newest comment moves the latest comment time backwards
+        newest.is_active = False
+        newest.save()
+        response = self.get(if_none_match=seen['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'Newest')
+
+    def test_dates_are_not_a_validator(self):
+        self.assertNotIn('Last-Modified', self.get())
+        self.assertEqual(self.get(if_modified_since='Fri, 01 Jan 2100 00:00:00 GMT').status_code, 200)
+
+    def test_validators_are_per_viewer_and_private(self):
+        response = self.get()
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        self.client.force_login(get_user_model().objects.create_user('someone', password='pw'))
+        self.assertEqual(self.get(if_none_match=response['ETag']).status_code, 200)
+
+    def test_flash_messages_are_always_rendered(self):
+        etag = self.get()['ETag']
+        with mock.patch('core.conditional.get_messages', return_value=['Category saved']):
+            self.assertEqual(self.get(if_none_match=etag).status_code, 200)
+        self.assertEqual(self.get(if_none_match=etag).status_code, 304)
+
+    def test_list_is_not_modified_until_an_article_changes(self):
+        url = reverse('articles:article_list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            Article.objects.create(title='New Story', content='<p>Body</p>', author=self.reader, status='PUBLISHED')
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 200)
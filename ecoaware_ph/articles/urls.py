@@ -7,6 +7,11 @@ urlpatterns = [
     # Article List & Create
     path('', views.article_list, name='article_list'),
     path('create/', views.article_create, name='article_create'),
+    path('api/', views.article_list_api, name='article_list_api'),
+
+    # Search
+    path('search/', views.article_search, name='article_search'),
+    path('api/search/', views.article_search_api, name='article_search_api'),
     
     # Category management (MUST be before article slug to avoid shadowing)
     path('categories/', views.category_list, name='category_list'),
@@ -18,6 +23,7 @@ urlpatterns = [
     path('<slug:slug>/', views.article_detail, name='article_detail'),
     path('<slug:slug>/edit/', views.article_update, name='article_update'),
     path('<slug:slug>/delete/', views.article_delete, name='article_delete'),
+    path('<slug:slug>/comments/', views.comment_list_api, name='comment_list_api'),
 
     # Comments
     path('comment/<int:pk>/delete/', views.comment_delete, name='comment_delete'),
@@ -2,6 +2,21 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from .models import Article
 from .forms import ArticleForm
+from .pagination import paginate_keyset
+from .view_counter import record_view
+from core.cache import namespace_version
+from core.conditional import page_etag, not_modified, with_validators
+from core.ratelimit import rate_limit
+
+
+ARTICLES_PER_PAGE = 9
+
+
+def _filtered_articles(category_slug=None):
+    articles = Article.objects.for_listing()
+    if category_slug:
+        articles = articles.filter(category__slug=category_slug)
+    return articles
 
 
 # =========================================================
@@ -11,31 +26,128 @@ from .forms import ArticleForm
 def article_list(request):
     from .models import Article, Category
     
+    # Search queries are served by the full-text index
+    if request.GET.get('q'):
+        return article_search(request)
+
     # Get parameters
     category_slug = request.GET.get('category')
+
+    # Any article or category change bumps these versions
+    etag = page_etag(
+        request, request.GET.urlencode(),
+        namespace_version('articles'), namespace_version('categories'),
+    )
+    response = not_modified(request, etag)
+    if response:
+        return response
     
-    # Base Query
-    articles = Article.objects.all()
-    
-    # Filter by Category
-    if category_slug:
-        articles = articles.filter(category__slug=category_slug)
-    
-    # Pagination
-    from django.core.paginator import Paginator
-    paginator = Paginator(articles, 9) # Show 9 articles per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Keyset pagination on (created_at, id): no COUNT(*), no OFFSET
+    page_obj = paginate_keyset(
+        _filtered_articles(category_slug),
+        cursor=request.GET.get('cursor'),
+        per_page=ARTICLES_PER_PAGE,
+    )
     
     # Get all categories for the dropdown
     categories = Category.objects.all()
     
     context = {
-        'articles': page_obj,  # Pass page_obj instead of all articles
+        'articles': page_obj,
         'categories': categories,
         'current_category': category_slug
     }
-    return render(request, 'organisms/article_list.html', context)
+    return with_validators(render(request, 'organisms/article_list.html', context), etag)
+
+
+@login_required
+def article_list_api(request):
+    from django.http import JsonResponse
+    from .pagination import approximate_count
+
+    category_slug = request.GET.get('category')
+    articles = _filtered_articles(category_slug)
+    page_obj = paginate_keyset(articles, cursor=request.GET.get('cursor'), per_page=ARTICLES_PER_PAGE)
+
+    data = {
+        'results': [
+            {
+                'title': article.title,
+                'url': article.get_absolute_url(),
+                'excerpt': article.excerpt or '',
+                'category': article.category.name if article.category else None,
+                'author': article.author.username,
+                'views': article.views,
+                'created_at': article.created_at.isoformat(),
+            }
+            for article in page_obj
+        ],
+        'next_cursor': page_obj.next_cursor,
+        'prev_cursor': page_obj.prev_cursor,
+    }
+    # The total is opt-in and only an estimate, so it never costs a full COUNT(*) on Postgres
+    if request.GET.get('total'):
+        data['approximate_total'] = approximate_count(articles)
+    return JsonResponse(data)
+
+
+# =========================================================
+# SEARCH ARTICLES
+# =========================================================
+SEARCH_PAGE_SIZE = 10
+
+
+def _search_params(request):
+    query = request.GET.get('q', '').strip()[:200]
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+    return query, page
+
+
+@login_required
+def article_search(request):
+    from .search import search_articles
+
+    query, page = _search_params(request)
+    results, has_next = search_articles(query, page=page, per_page=SEARCH_PAGE_SIZE)
+
+    return render(request, 'organisms/article_search.html', {
+        'query': query,
+        'results': results,
+        'page': page,
+        'has_next': has_next,
+        'has_previous': page > 1,
+    })
+
+
+@login_required
+def article_search_api(request):
+    from django.http import JsonResponse
+    from .search import search_articles
+
+    query, page = _search_params(request)
+    results, has_next = search_articles(query, page=page, per_page=SEARCH_PAGE_SIZE)
+
+    return JsonResponse({
+        'query': query,
+        'page': page,
+        'has_next': has_next,
+        'results': [
+            {
+                'title': article.title,
+                'url': article.get_absolute_url(),
+                'excerpt': article.excerpt or '',
+                'highlight': str(article.search_highlight),
+                'rank': article.search_rank,
+                'category': article.category.name if article.category else None,
+                'author': article.author.username,
+                'created_at': article.created_at.isoformat(),
+            }
+            for article in results
+        ],
+    })
 
 
 # =========================================================
@@ -63,14 +175,30 @@ def article_create(request):
 # VIEW ARTICLE DETAIL
 # =========================================================
 @login_required
+@rate_limit('comment')
 def article_detail(request, slug):
-    article = get_object_or_404(Article, slug=slug)
-    article.views += 1
-    article.save(update_fields=['views'])
+    article = get_object_or_404(Article.objects.for_detail(), slug=slug)
+    record_view(article)
 
     # Comments Logic
+    from django.db.models import Max
+    from django.utils import timezone
+    from .comments import comment_page
     from .forms import CommentForm
-    comments = article.comments.filter(is_active=True).order_by('-created_at')
+    from .models import Comment
+
+    # Revisits get a 304 until the article or its comments change. The hour
+    # bucket keeps the comments' "x ago" labels from going too stale.
+    # View counts are left out so they don't defeat revalidation. No
+    # Last-Modified: hiding the newest comment moves it back in time.
+    latest_comment = article.comments.filter(is_active=True).aggregate(latest=Max('created_at'))['latest']
+    etag = page_etag(
+        request, article.pk, article.updated_at, latest_comment,
+        article.comment_count, timezone.now().strftime('%Y%m%d%H'),
+    )
+    response = not_modified(request, etag)
+    if response:
+        return response
 
     if request.method == 'POST':
         comment_form = CommentForm(request.POST)
@@ -78,16 +206,54 @@ def article_detail(request, slug):
             comment = comment_form.save(commit=False)
             comment.article = article
             comment.author = request.user
+            # Replies attach to a top-level comment on the same article
+            parent_id = request.POST.get('parent')
+            if parent_id:
+                comment.parent = Comment.objects.filter(
+                    pk=parent_id, article=article, parent__isnull=True, is_active=True
+                ).first()
             comment.save()
             return redirect('articles:article_detail', slug=article.slug)
     else:
         comment_form = CommentForm()
 
-    return render(request, 'organisms/article_detail.html', {
+    response = render(request, 'organisms/article_detail.html', {
         'article': article,
-        'comments': comments,
+        'comments': comment_page(article),
         'comment_form': comment_form
     })
+    if request.method == 'GET':
+        with_validators(response, etag)
+    return response
+
+
+@login_required
+def comment_list_api(request, slug):
+    """Next page of an article's comments for the "Load more" button"""
+    from django.http import JsonResponse
+    from django.template.loader import render_to_string
+    from .comments import comment_page
+
+    article = get_object_or_404(Article.objects.only('pk', 'slug'), slug=slug)
+    page = comment_page(article, cursor=request.GET.get('cursor'))
+
+    return JsonResponse({
+        'comments': [
+            {
+                'id': comment.pk,
+                'author': comment.author.username,
+                'content': comment.content,
+                'created_at': comment.created_at.isoformat(),
+                'reply_count': len(comment.thread_replies),
+            }
+            for comment in page
+        ],
+        'html': ''.join(
+            render_to_string('includes/article_comment.html', {'comment': comment, 'article': article}, request=request)
+            for comment in page
+        ),
+        'next_cursor': page.next_cursor,
+    })
 
 
 # =========================================================
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:10
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_participant_count(apps, schema_editor):
+    Campaign = apps.get_model('campaigns', 'Campaign')
+    Through = Campaign.participants.through
+    counts = (
+        Through.objects.filter(campaign_id=models.OuterRef('pk'))
+        .order_by()
+        .values('campaign_id')
+        .annotate(total=models.Count('pk'))
+        .values('total')
+    )
+    Campaign.objects.update(participant_count=Coalesce(models.Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0005_campaign_goals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='participant_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_participant_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0008_campaign_image_renditions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(fields=['end_date'], name='campaign_end_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['end_date'], name='campaign_active_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaign',
+            index=models.Index(fields=['created_at'], name='campaign_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaignsuggestion',
+            index=models.Index(fields=['created_at'], name='suggestion_created_idx'),
+        ),
+    ]
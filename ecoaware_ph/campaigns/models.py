@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import IntegrityError, models, router, transaction
+from django.db.models.signals import m2m_changed
 from django.utils import timezone
 from django.urls import reverse
 from django_ckeditor_5.fields import CKEditor5Field
@@ -9,18 +10,94 @@ class Campaign(models.Model):
     title = models.CharField(max_length=200)
     description = CKEditor5Field('Description', config_name='extends')
     image = models.ImageField(upload_to='campaigns/', blank=True, null=True)
+    # Resized derivatives of image, filled in by core.images
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     start_date = models.DateTimeField()
     end_date = models.DateTimeField()
     is_active = models.BooleanField(default=True)
     goals = models.JSONField(default=list, blank=True, help_text="Campaign goals as JSON array")
     participants = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='joined_campaigns', blank=True)
+    # Denormalized len(participants), maintained by campaigns.signals
+    participant_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Current and past campaigns are both read in end_date order
+            models.Index(fields=['end_date'], name='campaign_end_date_idx'),
+            models.Index(fields=['end_date'], name='campaign_active_end_idx', condition=models.Q(is_active=True)),
+            models.Index(fields=['created_at'], name='campaign_created_idx'),
+        ]
+
     @property
     def is_ended(self):
         return timezone.now() > self.end_date
 
+    # =========================================================
+    # Membership
+    # =========================================================
+    # All lookups go through the join table's (campaign_id, user_id)
+    # unique index, so cost does not grow with the number of participants.
+
+    def _membership(self, user):
+        return Campaign.participants.through.objects.filter(campaign_id=self.pk, user_id=user.pk)
+
+    def is_participant(self, user):
+        if not getattr(user, 'is_authenticated', False):
+            return False
+        return self._membership(user).exists()
+
+    def toggle_participation(self, user):
+        """
+        Join the campaign if ``user`` isn't a participant, otherwise leave it.
+        Returns True if the user is a participant afterwards.
+
+        Leaving is a single DELETE; joining is an INSERT guarded by the
+        unique constraint, so concurrent toggles can't double-join or
+        double-count. m2m_changed is sent only for rows actually changed,
+        with ``exact=True`` so the count is adjusted instead of recounted.
+        """
+        Through = Campaign.participants.through
+        signal_kwargs = {
+            'sender': Through, 'instance': self, 'reverse': False,
+            'model': type(user), 'pk_set': {user.pk}, 'using': router.db_for_write(Through),
+            'exact': True,
+        }
+
+        with transaction.atomic():
+            deleted, _ = self._membership(user).delete()
+            if deleted:
+                m2m_changed.send(action='post_remove', **signal_kwargs)
+        if deleted:
+            return False
+
+        try:
+            with transaction.atomic():
+                Through.objects.create(campaign_id=self.pk, user_id=user.pk)
+        except IntegrityError:
+            # A concurrent request joined first; the user is a participant either way
+            return True
+        m2m_changed.send(action='post_add', **signal_kwargs)
+        return True
+
+    def recent_participants(self, limit=5, pin=None):
+        """
+        The most recently joined participants, newest first. ``pin``, a user
+        the caller knows to be a participant, is moved to the front of the list.
+        """
+        rows = (
+            Campaign.participants.through.objects
+            .filter(campaign_id=self.pk)
+            .select_related('user')
+            .order_by('-pk')
+        )
+        pinned = []
+        if pin is not None:
+            pinned = [pin]
+            rows = rows.exclude(user_id=pin.pk)
+        return pinned + [row.user for row in rows[:max(limit - len(pinned), 0)]]
+
     def __str__(self):
         return self.title
 
@@ -49,5 +126,10 @@ class CampaignSuggestion(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='suggestion_created_idx'),
+        ]
+
     def __str__(self):
         return self.title
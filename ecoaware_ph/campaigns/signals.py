@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import m2m_changed, pre_delete, post_delete
+from django.dispatch import receiver
+
+from core import analytics
+
+from .models import Campaign
+
+
+# =========================================================
+# PARTICIPANT COUNT MAINTENANCE
+# =========================================================
+def recount_participants(campaign_ids):
+    """Recompute participant_count for the given campaigns in one UPDATE."""
+    Through = Campaign.participants.through
+    counts = (
+        Through.objects.filter(campaign_id=OuterRef('pk'))
+        .order_by()
+        .values('campaign_id')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    Campaign.objects.filter(pk__in=campaign_ids).update(
+        participant_count=Coalesce(Subquery(counts), 0)
+    )
+
+
+def _joined_campaign_ids(user):
+    return list(Campaign.participants.through.objects.filter(user_id=user.pk).values_list('campaign_id', flat=True))
+
+
+@receiver(m2m_changed, sender=Campaign.participants.through)
+def update_participant_count(sender, instance, action, reverse, pk_set, exact=False, **kwargs):
+    if reverse:
+        # user.joined_campaigns.add/remove/clear(): pk_set holds campaign ids
+        if action == 'pre_clear':
+            instance._cleared_campaign_ids = _joined_campaign_ids(instance)
+        elif action == 'post_add':
+            Campaign.objects.filter(pk__in=pk_set).update(participant_count=F('participant_count') + 1)
+            analytics.record(analytics.CAMPAIGN_JOINS, dict.fromkeys(pk_set, 1))
+        elif action == 'post_remove':
+            recount_participants(pk_set)
+        elif action == 'post_clear':
+            recount_participants(getattr(instance, '_cleared_campaign_ids', []))
+        return
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if action == 'post_add':
+        # Django only passes the ids that were actually inserted
+        Campaign.objects.filter(pk=instance.pk).update(participant_count=F('participant_count') + len(pk_set))
+        analytics.record(analytics.CAMPAIGN_JOINS, {instance.pk: len(pk_set)})
+    elif action == 'post_remove' and exact:
+        # Campaign.toggle_participation: pk_set holds the rows it deleted
+        Campaign.objects.filter(pk=instance.pk).update(
+            participant_count=Greatest(F('participant_count') - len(pk_set), 0)
+        )
+    else:
+        # remove() reports the ids it was asked for, not the rows it deleted
+        recount_participants([instance.pk])
+
+
+# Deleting a user cascades through the join table without m2m_changed
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def remember_joined_campaigns(sender, instance, **kwargs):
+    instance._joined_campaign_ids = _joined_campaign_ids(instance)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def update_participant_count_on_user_delete(sender, instance, **kwargs):
+    from .tasks import recount_campaign_participants
+
+    campaign_ids = getattr(instance, '_joined_campaign_ids', None)
+    if campaign_ids:
+        # A user can be in many campaigns; recount them off the request
+        recount_campaign_participants.enqueue(campaign_ids)
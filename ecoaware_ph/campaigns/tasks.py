@@ -0,0 +1,11 @@
+from core.jobs import task
+
+from .signals import recount_participants
+
+
+# =========================================================
+# BACKGROUND JOBS (run by `manage.py runworker`)
+# =========================================================
+@task(priority=100)
+def recount_campaign_participants(campaign_ids):
+    recount_participants(campaign_ids)
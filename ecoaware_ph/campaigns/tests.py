@@ -1,3 +1,232 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.jobs import Worker
+
+from . import views
+from .models import Campaign
+
+
+def make_campaign(title='Coastal Cleanup', days=7):
+    return Campaign.objects.create(
+        title=title, description='-', start_date=timezone.now(), end_date=timezone.now() + timedelta(days=days),
+    )
+
+
+class ParticipantCountTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.users = [User.objects.create_user(f'volunteer{number}', password='pw') for number in range(3)]
+        self.campaign = make_campaign()
+
+    def count(self, campaign=None):
+        return Campaign.objects.values_list('participant_count', flat=True).get(pk=(campaign or self.campaign).pk)
+
+    def test_follows_every_way_of_changing_the_roster(self):
+        first, second, third = self.users
+        self.campaign.participants.add(first, second)
+        self.campaign.participants.add(first)
+        self.assertEqual(self.count(), 2)
+        self.campaign.participants.remove(first, third)
+        self.assertEqual(self.count(), 1)
+        self.assertTrue(self.campaign.toggle_participation(third))
+        self.assertEqual(self.count(), 2)
+        self.assertFalse(self.campaign.toggle_participation(third))
+        self.assertEqual(self.count(), 1)
+        self.campaign.participants.clear()
+        self.assertEqual(self.count(), 0)
+
+        other = make_campaign('River Watch')
+        first.joined_campaigns.add(self.campaign, other)
+        self.assertEqual((self.count(), self.count(other)), (1, 1))
+        first.joined_campaigns.clear()
+        self.assertEqual((self.count(), self.count(other)), (0, 0))
+
+    def test_leaving_does_not_recount_the_roster(self):
+        self.campaign.participants.add(*self.users)
+        with CaptureQueriesContext(connection) as captured:
+            self.assertFalse(self.campaign.toggle_participation(self.users[0]))
+        self.assertFalse([query for query in captured if 'COUNT(' in query['sql'].upper()])
+        self.assertEqual(self.count(), 2)
+
+        # A count that has drifted low never goes negative
+        Campaign.objects.filter(pk=self.campaign.pk).update(participant_count=0)
+        self.campaign.toggle_participation(self.users[1])
+        self.assertEqual(self.count(), 0)
+
+    def test_deleted_user_is_recounted_by_the_worker(self):
+        self.campaign.participants.add(*self.users)
+        self.users[0].delete()
+        Worker(sleep=0).run(burst=True)
+        self.assertEqual(self.count(), 2)
+
+    def test_list_reads_counts_without_a_query_per_campaign(self):
+        url = reverse('campaigns:campaign_list')
+        self.client.force_login(self.users[0])
+
+        def queries():
+            cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(url)
+            return len(captured), response
+
+        few, response = queries()
+        for number in range(4):
+            make_campaign(f'Campaign {number}').participants.add(*self.users[:number])
+        many, response = queries()
+        self.assertEqual(many, few)
+        self.assertContains(response, '3 Joined')
+
+
+class MembershipTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('volunteer', password='pw')
+        self.campaign = make_campaign()
+        self.detail_url = reverse('campaigns:campaign_detail', args=[self.campaign.pk])
+        self.join_url = reverse('campaigns:join_campaign', args=[self.campaign.pk])
+        self.client.force_login(self.user)
+
+    def test_join_and_leave(self):
+        self.assertContains(self.client.get(self.detail_url), 'Join Campaign')
+        self.client.get(self.join_url)
+        self.assertFalse(self.campaign.is_participant(self.user))
+
+        response = self.client.post(self.join_url, follow=True)
+        self.assertContains(response, 'Leave Campaign')
+        self.assertTrue(self.campaign.is_participant(self.user))
+        self.client.post(self.join_url)
+        self.assertFalse(self.campaign.is_participant(self.user))
+
+    def test_anonymous_user_is_never_a_participant(self):
+        with self.assertNumQueries(0):
+            self.assertFalse(self.campaign.is_participant(AnonymousUser()))
+
+    def test_concurrent_join_is_not_counted_twice(self):
+        Through = Campaign.participants.through
+        Through.objects.create(campaign_id=self.campaign.pk, user_id=self.user.pk)
+        # The other request's row isn't visible to our DELETE, but the INSERT hits it
+        with mock.patch.object(Campaign, '_membership', return_value=Through.objects.none()):
+            self.assertTrue(self.campaign.toggle_participation(self.user))
+        self.assertEqual(Through.objects.filter(campaign_id=self.campaign.pk).count(), 1)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.participant_count, 0)
+
+    def test_detail_cost_does_not_grow_with_the_roster(self):
+        self.campaign.participants.add(self.user)
+
+        def queries():
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(self.detail_url)
+            return len(captured), response
+
+        few, _ = queries()
+        User = get_user_model()
+        self.campaign.participants.add(*[User.objects.create_user(f'other{number}', password='pw') for number in range(30)])
+        many, response = queries()
+        self.assertEqual(many, few)
+        # The viewer is pinned to the front of the recent participants
+        self.assertEqual(response.context['recent_participants'][0], self.user)
+        self.assertEqual(len(response.context['recent_participants']), 5)
+
+    def test_detail_checks_membership_once(self):
+        self.campaign.participants.add(self.user)
+        with mock.patch.object(Campaign, 'is_participant', autospec=True, side_effect=Campaign.is_participant) as check:
+            response = self.client.get(self.detail_url)
+        self.assertEqual(check.call_count, 1)
+        self.assertTrue(response.context['is_participant'])
+        self.assertEqual(response.context['recent_participants'], [self.user])
+
+
+class RosterTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.campaign = make_campaign()
+        self.volunteers = [User.objects.create_user(f'volunteer{number:02d}', password='pw') for number in range(5)]
+        self.campaign.participants.add(*self.volunteers)
+        self.url = reverse('campaigns:campaign_participants', args=[self.campaign.pk])
+        self.client.force_login(self.volunteers[0])
+
+    @mock.patch.object(views, 'PARTICIPANTS_PER_PAGE', 2)
+    def test_pages_in_join_order(self):
+        pages = [self.client.get(self.url, {'page': page}) for page in (1, 2, 3)]
+        names = [user.username for response in pages for user in response.context['participants']]
+        self.assertEqual(names, [user.username for user in self.volunteers])
+        self.assertContains(pages[0], 'Page 1 of 3')
+        # Past the end: the last page, not an error
+        self.assertEqual(self.client.get(self.url, {'page': 9}).context['page_obj'].number, 3)
+
+
+class ParticipantExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.staff = User.objects.create_user('organizer', password='pw', is_staff=True)
+        cls.campaign = Campaign.objects.create(
+            title='Mangrove Planting', description='-',
+            start_date=timezone.now(), end_date=timezone.now() + timedelta(days=7),
+        )
+        for name in ('ana', 'ben', 'cora'):
+            cls.campaign.participants.add(User.objects.create_user(name, email=f'{name}@example.com', password='pw'))
+        cls.url = reverse('campaigns:campaign_participants_export', args=[cls.campaign.pk])
+
+    def test_csv_over_wsgi(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(self.url)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'username,email,first_name,last_name,date_joined')
+        self.assertEqual([line.split(',')[0] for line in lines[1:]], ['ana', 'ben', 'cora'])
+
+    @mock.patch.object(views, 'EXPORT_CHUNK_SIZE', 2)
+    async def test_asgi_streams_the_roster_in_chunks(self):
+        await self.async_client.aforce_login(self.staff)
+        response = await self.async_client.get(self.url, {'format': 'jsonl'})
+        self.assertTrue(response.is_async)
+        lines = [line async for line in response.streaming_content]
+        self.assertEqual([json.loads(line)['username'] for line in lines], ['ana', 'ben', 'cora'])
+
+    def test_jsonl_over_wsgi(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(self.url, {'format': 'jsonl'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertIn('participants.jsonl', response['Content-Disposition'])
+        records = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(records[0]['email'], 'ana@example.com')
+        self.assertEqual(set(records[0]), {'username', 'email', 'first_name', 'last_name', 'date_joined'})
+
+    def test_staff_only(self):
+        self.client.force_login(get_user_model().objects.get(username='ana'))
+        self.assertRedirects(self.client.get(self.url), reverse('home'), fetch_redirect_response=False)
+
+
+class CampaignDetailConditionalGetTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.viewer = User.objects.create_user('viewer', password='pw')
+        self.joiner = User.objects.create_user('joiner', password='pw')
+        self.campaign = Campaign.objects.create(
+            title='River Watch', description='-',
+            start_date=timezone.now(), end_date=timezone.now() + timedelta(days=30),
+        )
+        self.url = reverse('campaigns:campaign_detail', args=[self.campaign.pk])
+        self.client.force_login(self.viewer)
+
+    def test_someone_else_joining_is_a_change(self):
+        first = self.client.get(self.url)
+        self.assertNotIn('Last-Modified', first)
+        self.assertEqual(self.client.get(self.url, headers={'if-none-match': first['ETag']}).status_code, 304)
 
-# Create your tests here.
+        self.campaign.toggle_participation(self.joiner)
+        response = self.client.get(
+            self.url, headers={'if-none-match': first['ETag'], 'if-modified-since': 'Fri, 01 Jan 2100 00:00:00 GMT'},
+        )
+        self.assertEqual(response.status_code, 200)
@@ -17,4 +17,5 @@ urlpatterns = [
     # Join
     path('<int:pk>/join/', views.join_campaign, name='join_campaign'),
     path('<int:pk>/participants/', views.campaign_participants, name='campaign_participants'),
+    path('<int:pk>/participants/export/', views.campaign_participants_export, name='campaign_participants_export'),
 ]
@@ -3,42 +3,70 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from .models import Campaign
 from .forms import CampaignForm
+from core.cache import namespace_version
+from core.conditional import page_etag, not_modified, with_validators
+from core.ratelimit import rate_limit
 
 # List all campaigns
 @login_required
 def campaign_list(request):
     from django.utils import timezone
     now = timezone.now()
+
+    # Campaign/participant changes bump the namespace version; the hour
+    # bucket moves campaigns from active to archived as they end
+    etag = page_etag(request, namespace_version('campaigns'), now.strftime('%Y%m%d%H'))
+    response = not_modified(request, etag)
+    if response:
+        return response
     
     # Split campaigns into active and archived
     active_campaigns = Campaign.objects.filter(end_date__gte=now).order_by('end_date')
     archived_campaigns = Campaign.objects.filter(end_date__lt=now).order_by('-end_date')
     
     is_admin = request.user.is_staff  # True if the user is admin
-    return render(request, 'organisms/campaign_list.html', {
+    response = render(request, 'organisms/campaign_list.html', {
         'active_campaigns': active_campaigns,
         'archived_campaigns': archived_campaigns,
         'has_archived': archived_campaigns.exists(),
         'is_admin': is_admin
     })
+    return with_validators(response, etag)
 
 # Campaign detail
 @login_required
 def campaign_detail(request, pk):
+    from django.db.models import Max
+    from django.utils.timesince import timeuntil
+
     campaign = get_object_or_404(Campaign, pk=pk)
     is_admin = request.user.is_staff
+
+    # Revisits get a 304 until the campaign, its roster, the viewer's
+    # membership or the displayed time remaining changes. No Last-Modified:
+    # updated_at doesn't move when someone joins or leaves
+    latest_join = campaign.participants.through.objects.filter(
+        campaign_id=campaign.pk
+    ).aggregate(latest=Max('pk'))['latest']
+    is_participant = campaign.is_participant(request.user)
+    etag = page_etag(
+        request, campaign.pk, campaign.updated_at, campaign.participant_count,
+        latest_join, is_participant, timeuntil(campaign.end_date),
+    )
+    response = not_modified(request, etag)
+    if response:
+        return response
     
     # Get participants with current user first if applicable
-    participants = list(campaign.participants.all())
-    if request.user.is_authenticated and request.user in participants:
-        participants.remove(request.user)
-        participants.insert(0, request.user)
+    recent_participants = campaign.recent_participants(limit=5, pin=request.user if is_participant else None)
         
-    return render(request, 'organisms/campaign_detail.html', {
+    response = render(request, 'organisms/campaign_detail.html', {
         'campaign': campaign,
-        'recent_participants': participants[:5],
+        'recent_participants': recent_participants,
+        'is_participant': is_participant,
         'is_admin': is_admin
     })
+    return with_validators(response, etag)
 
 # Create a new campaign
 @login_required
@@ -132,23 +160,127 @@ def campaign_convert(request, suggestion_id):
     })
 
 @login_required
+@rate_limit('join')
 def join_campaign(request, pk):
     campaign = get_object_or_404(Campaign, pk=pk)
     if request.method == 'POST':
-        if request.user in campaign.participants.all():
-            campaign.participants.remove(request.user)
-            messages.success(request, f'You have left the campaign "{campaign.title}".')
-        else:
-            campaign.participants.add(request.user)
+        if campaign.toggle_participation(request.user):
             messages.success(request, f'You have successfully joined the campaign "{campaign.title}"!')
+        else:
+            messages.success(request, f'You have left the campaign "{campaign.title}".')
             
     return redirect('campaigns:campaign_detail', pk=pk)
 
+PARTICIPANTS_PER_PAGE = 48
+
+
 @login_required
 def campaign_participants(request, pk):
+    from django.core.paginator import Paginator
+
     campaign = get_object_or_404(Campaign, pk=pk)
-    participants = campaign.participants.all()
+    rows = (
+        Campaign.participants.through.objects
+        .filter(campaign_id=campaign.pk)
+        .select_related('user')
+        .only('user__username', 'user__first_name', 'user__last_name')
+        .order_by('pk')
+    )
+    page_obj = Paginator(rows, PARTICIPANTS_PER_PAGE).get_page(request.GET.get('page'))
+    participants = [row.user for row in page_obj]
     return render(request, 'organisms/campaign_participants.html', {
         'campaign': campaign,
-        'participants': participants
+        'participants': participants,
+        'page_obj': page_obj,
+        'is_admin': request.user.is_staff,
     })
+
+
+class _Echo:
+    """File-like object whose write() just hands the value back, for csv.writer"""
+    def write(self, value):
+        return value
+
+
+EXPORT_FIELDS = ('user__username', 'user__email', 'user__first_name', 'user__last_name', 'user__date_joined')
+EXPORT_CHUNK_SIZE = 2000
+
+
+def _roster_chunk(campaign_id, after):
+    """The next EXPORT_CHUNK_SIZE roster rows after participation ``after``, each led by its pk."""
+    return list(
+        Campaign.participants.through.objects
+        .filter(campaign_id=campaign_id, pk__gt=after)
+        .order_by('pk')
+        .values_list('pk', *EXPORT_FIELDS)[:EXPORT_CHUNK_SIZE]
+    )
+
+
+async def _aroster(campaign_id):
+    # StreamingHttpResponse would drain a sync iterator into one list
+    # under ASGI, so fetch a chunk at a time off the event loop instead
+    from asgiref.sync import sync_to_async
+
+    after = 0
+    while chunk := await sync_to_async(_roster_chunk)(campaign_id, after):
+        after = chunk[-1][0]
+        for row in chunk:
+            yield row[1:]
+
+
+def _export_lines(rows, encode, header=None):
+    """Wrap a roster iterator (sync, or async under ASGI) as one encoded line per row."""
+    if hasattr(rows, '__aiter__'):
+        async def lines():
+            if header is not None:
+                yield header
+            async for row in rows:
+                yield encode(row)
+    else:
+        def lines():
+            if header is not None:
+                yield header
+            for row in rows:
+                yield encode(row)
+    return lines()
+
+
+@login_required
+def campaign_participants_export(request, pk):
+    """Stream the full roster as CSV (default) or JSON Lines, staff only"""
+    if not request.user.is_staff:
+        return redirect('home')
+
+    import csv
+    import json
+    from django.core.handlers.asgi import ASGIRequest
+    from django.http import StreamingHttpResponse
+
+    campaign = get_object_or_404(Campaign, pk=pk)
+    if isinstance(request, ASGIRequest):
+        rows = _aroster(campaign.pk)
+    else:
+        rows = (
+            Campaign.participants.through.objects
+            .filter(campaign_id=campaign.pk)
+            .order_by('pk')
+            .values_list(*EXPORT_FIELDS)
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+    headers = [field.replace('user__', '') for field in EXPORT_FIELDS]
+
+    if request.GET.get('format') == 'jsonl':
+        def encode(row):
+            record = dict(zip(headers, row))
+            record['date_joined'] = record['date_joined'].isoformat()
+            return json.dumps(record) + '\n'
+        stream = _export_lines(rows, encode)
+        content_type, extension = 'application/x-ndjson', 'jsonl'
+    else:
+        writer = csv.writer(_Echo())
+        stream = _export_lines(rows, writer.writerow, header=writer.writerow(headers))
+        content_type, extension = 'text/csv', 'csv'
+
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="campaign-{campaign.pk}-participants.{extension}"'
+    return response
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Tag, Category
+from .models import Tag, Category, Job, JobResult
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
@@ -86,3 +86,34 @@ class CategoryAdmin(admin.ModelAdmin):
             )
         return '-'
     icon_preview.short_description = 'Icon'
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Pending and running background jobs"""
+
+    list_display = ['name', 'status', 'priority', 'attempts', 'max_attempts', 'run_after', 'locked_by', 'created_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name']
+    readonly_fields = ['attempts', 'locked_by', 'locked_at', 'last_error', 'created_at']
+    ordering = ['priority', 'run_after', 'id']
+
+
+@admin.register(JobResult)
+class JobResultAdmin(admin.ModelAdmin):
+    """Finished background jobs"""
+
+    list_display = ['name', 'job_id', 'status', 'attempts', 'duration', 'worker', 'finished_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name']
+    date_hierarchy = 'finished_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def duration(self, obj):
+        return f'{obj.duration_ms} ms'
+    duration.short_description = 'Duration'
@@ -0,0 +1,129 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import MetricBucket
+
+
+# =========================================================
+# TIME-SERIES ANALYTICS
+# =========================================================
+# Event counts per object, rolled up into core.models.MetricBucket rows:
+#
+#   record(ARTICLE_VIEWS, {article_id: hits, ...}, at)
+#   daily_series([ARTICLE_VIEWS, CAMPAIGN_JOINS], days=30)
+#
+# Every record() is one INSERT ... ON CONFLICT DO UPDATE that adds the
+# counts to the hourly buckets of each object and of the site total
+# (object_id 0), so charts never have to sum across objects. Buckets use
+# local time, so hours fold cleanly into local days.
+#
+# compact() (run by the job worker's housekeeping) rolls hourly buckets
+# older than ANALYTICS_HOURLY_RETENTION_DAYS into one daily bucket per
+# object. A series read is then one index range: at most one row per day
+# plus the hours not yet compacted, about a hundred rows for 30 days.
+#
+# Fed by the view counter flush (articles.view_counter) and by campaign
+# joins (campaigns.signals).
+
+ARTICLE_VIEWS = 'article_views'
+CAMPAIGN_JOINS = 'campaign_joins'
+
+SITE = 0
+
+UPSERT_BATCH_SIZE = 500
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def hour_start(at):
+    return timezone.localtime(at).replace(minute=0, second=0, microsecond=0)
+
+
+def _add(rows):
+    """Add ``[(metric, object_id, resolution, start, count)]`` onto their buckets, creating missing ones."""
+    table = connection.ops.quote_name(MetricBucket._meta.db_table)
+    adapt = connection.ops.adapt_datetimefield_value
+    with connection.cursor() as cursor:
+        for offset in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[offset:offset + UPSERT_BATCH_SIZE]
+            params = []
+            for metric, object_id, resolution, start, count in batch:
+                params += [metric, object_id, resolution, adapt(start), count]
+            cursor.execute(
+                f'INSERT INTO {table} (metric, object_id, resolution, start, "count") '
+                f"VALUES {', '.join(['(%s, %s, %s, %s, %s)'] * len(batch))} "
+                f'ON CONFLICT (metric, object_id, start, resolution) '
+                f'DO UPDATE SET "count" = {table}."count" + EXCLUDED."count"',
+                params,
+            )
+
+
+def record(metric, counts, at=None):
+    """Add ``{object_id: count}`` events to the hour containing ``at`` (default now)."""
+    counts = {object_id: count for object_id, count in counts.items() if count}
+    if not counts:
+        return
+    start = hour_start(at or timezone.now())
+    rows = [(metric, object_id, MetricBucket.HOUR, start, count) for object_id, count in sorted(counts.items())]
+    rows.append((metric, SITE, MetricBucket.HOUR, start, sum(counts.values())))
+    _add(rows)
+
+
+def record_at(timestamp):
+    """The aware datetime for a Unix ``timestamp`` passed through a job's arguments."""
+    return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc) if timestamp is not None else None
+
+
+def compact(now=None):
+    """Roll hourly buckets older than the retention window into daily ones; returns the hours folded."""
+    table = connection.ops.quote_name(MetricBucket._meta.db_table)
+    adapt = connection.ops.adapt_datetimefield_value
+    today = timezone.localdate(now)
+    cutoff = _day_start(today - timedelta(days=settings.ANALYTICS_HOURLY_RETENTION_DAYS))
+    hourly = MetricBucket.objects.filter(resolution=MetricBucket.HOUR, start__lt=cutoff)
+
+    folded = 0
+    # One local day per transaction; DELETE ... RETURNING hands back exactly
+    # the rows removed, so a late write to an old hour is never lost
+    while (oldest := hourly.order_by('start').values_list('start', flat=True).first()) is not None:
+        day = timezone.localdate(oldest)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {table} WHERE resolution = %s AND start >= %s AND start < %s '
+                f'RETURNING metric, object_id, "count"',
+                [MetricBucket.HOUR, adapt(_day_start(day)), adapt(_day_start(day + timedelta(days=1)))],
+            )
+            removed = cursor.fetchall()
+            totals = defaultdict(int)
+            for metric, object_id, count in removed:
+                totals[(metric, object_id)] += count
+            _add([
+                (metric, object_id, MetricBucket.DAY, _day_start(day), count)
+                for (metric, object_id), count in sorted(totals.items())
+            ])
+        folded += len(removed)
+    return folded
+
+
+def daily_series(metrics, object_id=SITE, days=30, now=None):
+    """
+    ``{metric: [(date, count), ...]}`` for the last ``days`` local days up
+    to today, oldest first, with empty days as 0. One query for all metrics.
+    """
+    today = timezone.localdate(now)
+    first = today - timedelta(days=days - 1)
+    totals = {metric: defaultdict(int) for metric in metrics}
+    buckets = MetricBucket.objects.filter(
+        metric__in=metrics, object_id=object_id, start__gte=_day_start(first),
+    ).values_list('metric', 'start', 'count')
+    for metric, start, count in buckets:
+        totals[metric][timezone.localdate(start)] += count
+    dates = [first + timedelta(days=offset) for offset in range(days)]
+    return {metric: [(day, totals[metric][day]) for day in dates] for metric in metrics}
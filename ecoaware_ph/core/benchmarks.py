@@ -0,0 +1,283 @@
+import contextlib
+import json
+import logging
+import math
+import platform
+import random
+import subprocess
+import time
+from unittest import mock
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from articles.models import Article, Category, Comment
+from articles.pagination import encode_cursor
+from campaigns.models import Campaign
+from . import llm
+
+
+# =========================================================
+# BENCHMARKS FOR THE MAIN USER JOURNEYS
+# =========================================================
+# Each scenario replays one request through the Django test client
+# against whatever database is configured (seed it first, see
+# core.seeding) and records, per request, the number of queries and the
+# wall time. A scenario passes when its worst query count and its p95
+# latency stay within budget:
+#
+#   Scenario('article_detail', _article_detail, max_queries=6, p95_ms=150)
+#
+# Query budgets are today's counts, so any new query per request fails
+# the suite (lower them when a change saves queries); they hold at any
+# data volume and are checked by core.tests. Latency budgets are meant
+# for the "full" dataset on PostgreSQL and are skipped with --no-latency.
+# The EcoBot model is replaced by a stub that answers immediately, so the
+# chat scenario measures our side of the request only.
+#
+# The report is plain JSON with sorted keys, so two runs can be diffed
+# directly or with ``manage.py benchmark --compare``.
+
+REPORT_VERSION = 1
+
+BENCH_READER = 'bench-reader'
+BENCH_STAFF = 'bench-staff'
+
+
+class Scenario:
+    def __init__(self, name, build_request, max_queries, p95_ms, staff=False):
+        self.name = name
+        self.build_request = build_request
+        self.max_queries = max_queries
+        self.p95_ms = p95_ms
+        self.staff = staff
+
+
+class Workload:
+    """Ids and URLs the scenarios draw from, sampled once per run."""
+
+    SAMPLE_SIZE = 200
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        published = Article.objects.filter(status='PUBLISHED')
+        self.article_slugs = list(published.order_by('-comment_count', '-pk').values_list('slug', flat=True)[:self.SAMPLE_SIZE])
+        self.category_slugs = list(Category.objects.values_list('slug', flat=True))
+        now = timezone.now()
+        self.campaign_ids = list(
+            Campaign.objects.filter(end_date__gte=now).order_by('-participant_count').values_list('pk', flat=True)[:self.SAMPLE_SIZE]
+        )
+        # A page well into the listing, reached through its cursor
+        total = Article.objects.count()
+        middle = Article.objects.order_by('-created_at', '-id')[total // 2:total // 2 + 1].first()
+        self.deep_cursor = encode_cursor(middle, 'next') if middle else None
+        self.chat_counter = 0
+
+    def pick(self, values):
+        return self.rng.choice(values) if values else None
+
+
+def _article_list(workload):
+    return 'get', reverse('articles:article_list'), None
+
+
+def _article_list_deep(workload):
+    query = {'cursor': workload.deep_cursor} if workload.deep_cursor else None
+    return 'get', reverse('articles:article_list'), query
+
+
+def _article_list_category(workload):
+    return 'get', reverse('articles:article_list'), {'category': workload.pick(workload.category_slugs) or ''}
+
+
+def _article_detail(workload):
+    return 'get', reverse('articles:article_detail', args=[workload.pick(workload.article_slugs)]), None
+
+
+def _campaign_list(workload):
+    return 'get', reverse('campaigns:campaign_list'), None
+
+
+def _campaign_join(workload):
+    # join_campaign toggles, so repeated runs alternate joining and leaving
+    return 'post', reverse('campaigns:join_campaign', args=[workload.pick(workload.campaign_ids)]), None
+
+
+def _user_dashboard(workload):
+    return 'get', reverse('users:user_dashboard'), None
+
+
+def _admin_dashboard(workload):
+    return 'get', reverse('users:admin_dashboard'), None
+
+
+def _chat(workload):
+    # A new question each time, so it misses the answer cache and reaches the model
+    workload.chat_counter += 1
+    message = f'What can my barangay do about river pollution, take {workload.chat_counter}?'
+    return 'post', '/api/chat/', json.dumps({'message': message})
+
+
+SCENARIOS = [
+    Scenario('article_list', _article_list, max_queries=4, p95_ms=150),
+    Scenario('article_list_deep', _article_list_deep, max_queries=4, p95_ms=150),
+    Scenario('article_list_category', _article_list_category, max_queries=4, p95_ms=150),
+    Scenario('article_detail', _article_detail, max_queries=6, p95_ms=150),
+    Scenario('campaign_list', _campaign_list, max_queries=5, p95_ms=200),
+    Scenario('campaign_join', _campaign_join, max_queries=11, p95_ms=100),
+    Scenario('user_dashboard', _user_dashboard, max_queries=4, p95_ms=100),
+    Scenario('admin_dashboard', _admin_dashboard, max_queries=8, p95_ms=200, staff=True),
+    Scenario('chat', _chat, max_queries=2, p95_ms=100),
+]
+
+
+async def _stub_reply(message):
+    return 'Thanks for asking! Start with a community cleanup and a materials recovery facility.'
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values``."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def bench_user(username, staff):
+    user, created = get_user_model().objects.get_or_create(
+        username=username,
+        defaults={'email': f'{username}@example.com', 'is_staff': staff, 'password': make_password(None)},
+    )
+    return user
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True, cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextlib.contextmanager
+def benchmark_settings():
+    # One JSON log line per request would swamp the output and the timings
+    request_log = logging.getLogger('core.requests')
+    log_level = request_log.level
+    request_log.setLevel(logging.WARNING)
+    # Keep the stubbed chat off the rate limiter and out of the real model
+    try:
+        with override_settings(RATELIMIT_ENABLED=False, GROQ_API_KEY='benchmark', ALLOWED_HOSTS=['*']), \
+                mock.patch.object(llm, 'complete_reply', _stub_reply):
+            yield
+    finally:
+        request_log.setLevel(log_level)
+
+
+def run_scenario(scenario, client, workload, iterations, warmup, check_latency=True):
+    timings, queries = [], []
+    statuses = set()
+    for iteration in range(warmup + iterations):
+        method, path, data = scenario.build_request(workload)
+        kwargs = {'content_type': 'application/json'} if method == 'post' and isinstance(data, str) else {}
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = getattr(client, method)(path, data, **kwargs)
+            elapsed = (time.perf_counter() - started) * 1000
+        if iteration < warmup:
+            continue
+        timings.append(elapsed)
+        queries.append(len(captured))
+        statuses.add(response.status_code)
+
+    result = {
+        'iterations': iterations,
+        'statuses': sorted(statuses),
+        'queries': {'min': min(queries), 'max': max(queries)},
+        'latency_ms': {
+            'p50': round(percentile(timings, 50), 2),
+            'p95': round(percentile(timings, 95), 2),
+            'max': round(max(timings), 2),
+            'mean': round(sum(timings) / len(timings), 2),
+        },
+        'budget': {'max_queries': scenario.max_queries, 'p95_ms': scenario.p95_ms},
+    }
+    failures = []
+    if any(status >= 400 for status in statuses):
+        failures.append(f'error status {sorted(statuses)}')
+    if result['queries']['max'] > scenario.max_queries:
+        failures.append(f"{result['queries']['max']} queries > {scenario.max_queries}")
+    if check_latency and result['latency_ms']['p95'] > scenario.p95_ms:
+        failures.append(f"p95 {result['latency_ms']['p95']}ms > {scenario.p95_ms}ms")
+    result['failures'] = failures
+    result['passed'] = not failures
+    return result
+
+
+def dataset_summary():
+    return {
+        'users': get_user_model().objects.count(),
+        'articles': Article.objects.count(),
+        'comments': Comment.objects.count(),
+        'campaigns': Campaign.objects.count(),
+        'participations': Campaign.participants.through.objects.count(),
+    }
+
+
+def run_suite(iterations=30, warmup=3, only=None, check_latency=True, seed=0):
+    """Run every scenario (or those named in ``only``) and return the report dict."""
+    scenarios = [scenario for scenario in SCENARIOS if not only or scenario.name in only]
+    clients = {}
+    for staff, username in ((False, BENCH_READER), (True, BENCH_STAFF)):
+        clients[staff] = Client()
+        clients[staff].force_login(bench_user(username, staff))
+
+    workload = Workload(seed)
+    results = {}
+    with benchmark_settings():
+        for scenario in scenarios:
+            results[scenario.name] = run_scenario(
+                scenario, clients[scenario.staff], workload, iterations, warmup, check_latency,
+            )
+
+    return {
+        'version': REPORT_VERSION,
+        'commit': _git_commit(),
+        'created_at': timezone.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'db_pool_mode': settings.DB_POOL_MODE,
+        },
+        'settings': {'iterations': iterations, 'warmup': warmup, 'latency_checked': check_latency, 'seed': seed},
+        'dataset': dataset_summary(),
+        'scenarios': results,
+        'passed': all(result['passed'] for result in results.values()),
+    }
+
+
+def compare_reports(previous, current):
+    """One line per scenario: query and p95 changes between two reports."""
+    lines = []
+    for name, result in sorted(current['scenarios'].items()):
+        before = previous.get('scenarios', {}).get(name)
+        if before is None:
+            lines.append(f'{name}: new')
+            continue
+        queries = result['queries']['max'] - before['queries']['max']
+        p95_before, p95_after = before['latency_ms']['p95'], result['latency_ms']['p95']
+        change = (p95_after - p95_before) / p95_before * 100 if p95_before else 0
+        lines.append(
+            f"{name}: queries {before['queries']['max']} -> {result['queries']['max']} ({queries:+d}), "
+            f'p95 {p95_before}ms -> {p95_after}ms ({change:+.1f}%)'
+        )
+    return lines
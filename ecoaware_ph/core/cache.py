@@ -0,0 +1,260 @@
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from django.core.cache import cache, caches
+from django.utils.connection import ConnectionProxy
+
+from .instrumentation import record_cache_lookup
+
+# Small, long-lived bookkeeping entries (namespace versions, counters) live
+# in their own cache so they never expire or get culled with page data
+state = ConnectionProxy(caches, 'state')
+
+
+# =========================================================
+# NAMESPACED, VERSIONED CACHE HELPERS
+# =========================================================
+# Every app caches under its own namespace ("articles", "campaigns", ...).
+# Keys embed the namespace's current version, so invalidating a namespace
+# is one write: old entries simply stop being addressed and age out on
+# their own. See core.signals for the model hooks that bump them.
+#
+# A version is a fresh unique token rather than a counter, so it needs no
+# atomic increment and a lost version key can never fall back to one
+# that was used before (which would resurrect old entries and ETags).
+
+NAMESPACES = ('articles', 'campaigns', 'categories', 'home', 'chat', 'dashboard')
+
+_VERSION_KEY = 'ns-version:{}'
+
+
+def _new_version():
+    return time.time_ns()
+
+
+def namespace_version(namespace):
+    key = _VERSION_KEY.format(namespace)
+    version = state.get(key)
+    if version is None:
+        # add() so concurrent first readers agree on the starting version
+        version = _new_version()
+        state.add(key, version, timeout=None)
+        version = state.get(key, version)
+    return version
+
+
+def invalidate_namespace(namespace):
+    """Drop every entry cached under ``namespace``."""
+    state.set(_VERSION_KEY.format(namespace), _new_version(), timeout=None)
+
+
+def make_key(namespace, *parts):
+    suffix = ':'.join(str(part) for part in parts)
+    return f'{namespace}:v{namespace_version(namespace)}:{suffix}'
+
+
+_MISSING = object()
+
+
+def cached(namespace, parts, builder, timeout=300):
+    """
+    Return the cached value for ``(namespace, *parts)``, calling ``builder()``
+    and storing its result on a miss. Hits and misses are counted per namespace.
+    """
+    if not isinstance(parts, (list, tuple)):
+        parts = (parts,)
+    key = make_key(namespace, *parts)
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        stats.record(namespace, hit=True)
+        return value
+
+    stats.record(namespace, hit=False)
+    value = builder()
+    cache.set(key, value, timeout)
+    return value
+
+
+# =========================================================
+# STALE-WHILE-REVALIDATE FRAGMENTS
+# =========================================================
+# A fragment is stored under a stable key together with the versions of
+# the namespaces it was built from and a freshness deadline. When it goes
+# stale (deadline passed, or a dependency namespace was invalidated) the
+# first request to win a short lock rebuilds it; every other request keeps
+# serving the stale copy instead of piling onto the database. With no copy
+# at all (cold start, eviction) the losers wait briefly for the winner's
+# and fall back to ``default`` rather than all building it at once.
+
+REBUILD_LOCK_TIMEOUT = 30
+REBUILD_WAIT = 2
+REBUILD_POLL_INTERVAL = 0.05
+
+
+def _await_fragment(key):
+    deadline = time.monotonic() + REBUILD_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(REBUILD_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def cached_fragment(name, builder, depends_on=(), ttl=300, stale_ttl=3600, default=''):
+    key = make_key('home', 'fragment', name)
+    lock_key = key + ':rebuilding'
+    versions = tuple(namespace_version(namespace) for namespace in depends_on)
+    entry = cache.get(key)
+
+    if entry is not None:
+        built_versions, fresh_until, value = entry
+        if built_versions == versions and time.time() < fresh_until:
+            stats.record('home', hit=True)
+            return value
+
+    if not cache.add(lock_key, 1, timeout=REBUILD_LOCK_TIMEOUT):
+        # Someone else is rebuilding; serve what we have, or wait for theirs
+        entry = entry or _await_fragment(key)
+        stats.record('home', hit=entry is not None)
+        return entry[2] if entry is not None else default
+
+    stats.record('home', hit=False)
+    try:
+        value = builder()
+        cache.set(key, (versions, time.time() + ttl, value), timeout=ttl + stale_ttl)
+    finally:
+        cache.delete(lock_key)
+    return value
+
+
+# =========================================================
+# CROSS-PROCESS COUNTERS
+# =========================================================
+# Totals summed over every worker without a shared increment: the file
+# cache has no atomic incr (its get-then-set loses concurrent adds and
+# resets the timeout). Each process keeps its own running totals and
+# writes them whole under a key only it uses, and lists that key in a
+# roster; readers add up everything on the roster. A roster entry lost to
+# a race is put back by the owner's next push.
+#
+# Every restart or deploy starts new processes, so process keys expire a
+# day after their last push and readers drop expired keys from the
+# roster. A process that has been idle that long reappears on its next
+# push with its full totals.
+
+class SharedCounters:
+    PROCESS_TTL = 60 * 60 * 24
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._totals = defaultdict(int)
+        self._owner = None
+
+    @property
+    def _roster_key(self):
+        return f'counters:{self.name}:processes'
+
+    def _process_key(self):
+        # A new key after a fork, so a child never overwrites its parent's totals
+        pid = os.getpid()
+        if self._owner is None or self._owner[0] != pid:
+            self._owner = (pid, f'counters:{self.name}:{uuid.uuid4().hex}')
+            self._totals = defaultdict(int)
+        return self._owner[1]
+
+    def add(self, counts):
+        """Add ``{counter: amount}`` to this process's totals and publish them."""
+        with self._lock:
+            key = self._process_key()
+            for name, amount in counts.items():
+                self._totals[name] += amount
+            totals = dict(self._totals)
+        state.set(key, totals, timeout=self.PROCESS_TTL)
+        roster = state.get(self._roster_key) or []
+        if key not in roster:
+            state.set(self._roster_key, roster + [key], timeout=None)
+
+    def totals(self):
+        """``{counter: total}`` over every process that has published."""
+        roster = state.get(self._roster_key) or []
+        published = state.get_many(roster)
+        if len(published) < len(roster):
+            self._prune(set(roster) - set(published))
+        combined = defaultdict(int)
+        for totals in published.values():
+            for name, amount in totals.items():
+                combined[name] += amount
+        return combined
+
+    def _prune(self, expired):
+        # Re-read so keys added since are kept; a live key dropped by a race is re-added on its next push
+        roster = state.get(self._roster_key) or []
+        state.set(self._roster_key, [key for key in roster if key not in expired], timeout=None)
+
+    def reset(self):
+        with self._lock:
+            self._totals = defaultdict(int)
+        state.delete_many((state.get(self._roster_key) or []) + [self._roster_key])
+
+
+# =========================================================
+# HIT / MISS COUNTERS
+# =========================================================
+# Counted in-process and pushed every few seconds, so the ops endpoint
+# sees totals across all workers without paying a cache write on every
+# lookup.
+
+class CacheStats:
+    PUSH_INTERVAL = 5
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = defaultdict(int)
+        self._last_push = time.monotonic()
+        self._shared = SharedCounters('cache-stats')
+
+    def record(self, namespace, hit):
+        record_cache_lookup(hit)
+        with self._lock:
+            self._local[f"{namespace}:{'hits' if hit else 'misses'}"] += 1
+            due = time.monotonic() - self._last_push >= self.PUSH_INTERVAL
+        if due:
+            self.push()
+
+    def push(self):
+        with self._lock:
+            local = dict(self._local)
+            self._local.clear()
+            self._last_push = time.monotonic()
+        if local:
+            self._shared.add(local)
+
+    def snapshot(self):
+        """Totals per namespace across all workers, including this one's unpushed counts."""
+        self.push()
+        totals = self._shared.totals()
+        report = {}
+        for namespace in NAMESPACES:
+            hits = totals[f'{namespace}:hits']
+            misses = totals[f'{namespace}:misses']
+            total = hits + misses
+            report[namespace] = {
+                'version': namespace_version(namespace),
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / total, 4) if total else None,
+            }
+        return report
+
+    def reset(self):
+        with self._lock:
+            self._local.clear()
+        self._shared.reset()
+
+
+stats = CacheStats()
@@ -0,0 +1,58 @@
+import hashlib
+
+from django.contrib.messages import get_messages
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+# =========================================================
+# CONDITIONAL GET HELPERS
+# =========================================================
+# Views derive a validator from cheap state (timestamps, counters, cache
+# namespace versions) before doing any rendering. If the client already
+# holds that version of the page it gets a bare 304.
+#
+#   etag = page_etag(request, article.pk, article.updated_at, ...)
+#   response = not_modified(request, etag, last_modified)
+#   if response:
+#       return response
+#   ...
+#   return with_validators(render(...), etag, last_modified)
+
+
+def page_etag(request, *parts):
+    """
+    Weak ETag over ``parts`` plus the viewer's identity. The CSRF secret is
+    included so a cached page never replays a form token from another session.
+    """
+    user = request.user
+    viewer = f'{user.pk}:{user.is_staff}' if getattr(user, 'is_authenticated', False) else 'anon'
+    get_token(request)  # make sure the CSRF secret exists
+    csrf_secret = request.META.get('CSRF_COOKIE', '')
+    raw = '|'.join(str(part) for part in (viewer, csrf_secret, *parts))
+    return 'W/"%s"' % hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+
+def not_modified(request, etag, last_modified=None):
+    """Return a 304 response if the client's copy is current, else None."""
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    # Flash messages must be shown, so the page has to be rendered
+    if len(get_messages(request)):
+        return None
+
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        with_validators(response, etag, last_modified)
+    return response
+
+
+def with_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Per-user pages: browsers may keep a copy but must revalidate each time
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections
+
+from .cache import SharedCounters
+
+
+# =========================================================
+# DATABASE CONNECTION METRICS
+# =========================================================
+# How connections are managed is decided in settings (DB_POOL_MODE, see
+# ecoaware_ph/database.py). This module reports on it:
+#
+# - checkouts:          connections handed out by the pool
+# - waits / wait_ms:    checkouts that had to queue for a free connection
+# - errors:             checkouts that timed out, failed connection attempts
+# - connections_opened: new server connections (pool refills, or every
+#                       connect outside pool mode)
+# - connections_lost:   connections found broken by a health check or
+#                       returned to the pool in a bad state
+# - query_errors:       requests that died on a database connection error
+#
+# Like the cache counters these are kept per process and pushed every few
+# seconds (core.cache.SharedCounters), so /ops/db/ shows totals for every
+# worker. Pool sizes are gauges and only describe the answering process.
+
+COUNTERS = ('checkouts', 'waits', 'wait_ms', 'errors', 'connections_opened', 'connections_lost', 'query_errors')
+
+# Our counters and the psycopg_pool stats that feed them
+POOL_COUNTERS = {
+    'checkouts': ('requests_num',),
+    'waits': ('requests_queued',),
+    'wait_ms': ('requests_wait_ms',),
+    'errors': ('requests_errors', 'connections_errors'),
+    'connections_opened': ('connections_num',),
+    'connections_lost': ('connections_lost', 'returns_bad'),
+}
+
+POOL_GAUGES = ('pool_min', 'pool_max', 'pool_size', 'pool_available', 'requests_waiting')
+
+
+def get_pool(alias='default'):
+    """The psycopg connection pool behind ``alias``, or None when it isn't pooled."""
+    return getattr(connections[alias], 'pool', None)
+
+
+class PoolStats:
+    PUSH_INTERVAL = 5
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+        self._lock = threading.Lock()
+        self._local = defaultdict(int)
+        self._last_push = time.monotonic()
+        self._shared = SharedCounters('db-pool-stats')
+
+    def record(self, **counts):
+        with self._lock:
+            for name, count in counts.items():
+                self._local[name] += count
+
+    def collect(self, pool=None):
+        """Move the pool's counters since the last call into ours."""
+        pool = pool or get_pool(self.alias)
+        if pool is None:
+            return
+        popped = pool.pop_stats()
+        self.record(**{
+            name: sum(popped.get(source, 0) for source in sources)
+            for name, sources in POOL_COUNTERS.items()
+        })
+
+    def maybe_push(self):
+        if time.monotonic() - self._last_push >= self.PUSH_INTERVAL:
+            self.collect()
+            self.push()
+
+    def push(self):
+        with self._lock:
+            local = {name: count for name, count in self._local.items() if count}
+            self._local.clear()
+            self._last_push = time.monotonic()
+        if local:
+            self._shared.add(local)
+
+    def snapshot(self):
+        """Totals across all workers plus this process's pool gauges."""
+        self.collect()
+        self.push()
+        shared = self._shared.totals()
+        totals = {name: shared[name] for name in COUNTERS}
+        totals['avg_wait_ms'] = round(totals['wait_ms'] / totals['waits'], 1) if totals['waits'] else None
+
+        database = settings.DATABASES[self.alias]
+        process = {'pid': os.getpid()}
+        pool = get_pool(self.alias)
+        if pool is not None:
+            current = pool.get_stats()
+            process.update({name: current.get(name, 0) for name in POOL_GAUGES})
+        else:
+            process.update({
+                'conn_max_age': database.get('CONN_MAX_AGE', 0),
+                'health_checks': database.get('CONN_HEALTH_CHECKS', False),
+            })
+
+        return {
+            'mode': settings.DB_POOL_MODE,
+            'vendor': connections[self.alias].vendor,
+            'totals': totals,
+            'process': process,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._local.clear()
+        pool = get_pool(self.alias)
+        if pool is not None:
+            pool.pop_stats()
+        self._shared.reset()
+
+
+stats = PoolStats()
@@ -0,0 +1,434 @@
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, defaultdict, deque
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+
+from .cache import SharedCounters, cached, make_key, namespace_version, state, stats as cache_stats
+
+
+# =========================================================
+# ECOBOT SHORT-CIRCUITS
+# =========================================================
+# Before a message goes to the model, two cheaper sources are tried:
+#
+#   1. the FAQ matcher: site-navigation questions ("how do I join a
+#      campaign?") answered from our own campaigns and articles
+#   2. the answer cache: earlier model replies keyed on the normalized
+#      prompt, so the hundredth "how do I recycle plastic?" is free
+#
+# Only if both miss does the request pay for a remote completion, whose
+# reply is then cached for the next asker.
+
+FILLER_WORDS = {'please', 'pls', 'plz', 'hi', 'hello', 'hey', 'ecobot', 'thanks', 'thank', 'kindly'}
+STOP_WORDS = {
+    'a', 'an', 'the', 'i', 'me', 'my', 'we', 'you', 'your', 'to', 'of', 'in', 'on', 'at', 'for',
+    'and', 'or', 'is', 'are', 'be', 'do', 'does', 'can', 'how', 'what', 'where', 'which', 'when',
+    'about', 'with', 'this', 'that', 'it', 'there', 'any', 'some', 'get', 'want', 'would', 'like',
+}
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+# Longer messages are rarely repeats and rarely navigation questions
+MAX_CACHEABLE_LENGTH = 300
+MAX_FAQ_WORDS = 20
+
+
+def normalize_prompt(text):
+    """Case-, punctuation- and greeting-insensitive form of a chat message."""
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    return ' '.join(word for word in _WORD_RE.findall(text) if word not in FILLER_WORDS)
+
+
+def _keywords(text):
+    return {word for word in normalize_prompt(text).split() if word not in STOP_WORDS}
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+# =========================================================
+# ANSWER CACHE
+# =========================================================
+# Two tiers: a small in-process LRU in front of the shared cache. The LRU
+# answers hot questions without a cache round trip and evicts the least
+# recently asked once CHAT_CACHE_MAX_ENTRIES is reached; the shared tier
+# lets workers reuse each other's answers. Both expire after CHAT_CACHE_TTL.
+
+class AnswerCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def _key(self, prompt):
+        normalized = normalize_prompt(prompt)
+        if not normalized or len(normalized) > MAX_CACHEABLE_LENGTH:
+            return None
+        digest = hashlib.sha1(f'{settings.CHAT_MODEL}|{normalized}'.encode()).hexdigest()
+        return make_key('chat', 'answer', digest)
+
+    def get(self, prompt):
+        """``(answer, model_latency)`` for a previously answered prompt, or None."""
+        key = self._key(prompt)
+        if key is None:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if now < expires_at:
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+
+        value = cache.get(key)
+        cache_stats.record('chat', hit=value is not None)
+        if value is not None:
+            self._remember_locally(key, value)
+        return value
+
+    def set(self, prompt, answer, model_latency):
+        key = self._key(prompt)
+        if key is None or not answer:
+            return
+        value = (answer, model_latency)
+        cache.set(key, value, settings.CHAT_CACHE_TTL)
+        self._remember_locally(key, value)
+
+    def _remember_locally(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + settings.CHAT_CACHE_TTL, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.CHAT_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+answers = AnswerCache()
+
+
+# =========================================================
+# FAQ / INTENT MATCHER
+# =========================================================
+# The index (titles and links of live campaigns and published articles)
+# is rebuilt whenever the articles or campaigns namespaces are bumped, and
+# at least hourly so campaigns that have ended drop out.
+
+FAQ_CAMPAIGN_LIMIT = 200
+FAQ_ARTICLE_LIMIT = 300
+
+
+def build_faq_index():
+    from articles.models import Article
+    from campaigns.models import Campaign
+
+    campaigns = [
+        {
+            'title': title,
+            'url': reverse('campaigns:campaign_detail', args=[pk]),
+            'ends': timezone.localtime(end_date).strftime('%b %d, %Y'),
+            'keywords': _keywords(title),
+        }
+        for pk, title, end_date in (
+            Campaign.objects
+            .filter(is_active=True, end_date__gt=timezone.now())
+            .order_by('end_date')
+            .values_list('pk', 'title', 'end_date')[:FAQ_CAMPAIGN_LIMIT]
+        )
+    ]
+    articles = [
+        {
+            'title': title,
+            'url': reverse('articles:article_detail', args=[slug]),
+            'keywords': _keywords(title),
+        }
+        for title, slug in (
+            Article.objects
+            .filter(status='PUBLISHED')
+            .order_by('-created_at')
+            .values_list('title', 'slug')[:FAQ_ARTICLE_LIMIT]
+        )
+    ]
+    return {'campaigns': campaigns, 'articles': articles}
+
+
+_faq_lock = threading.Lock()
+_faq_index = (None, None)
+
+
+def faq_index():
+    global _faq_index
+    versions = (namespace_version('articles'), namespace_version('campaigns'), int(time.time() // 3600))
+    with _faq_lock:
+        built_for, index = _faq_index
+    if built_for != versions:
+        index = cached('chat', ('faq-index', *versions), build_faq_index, timeout=3600)
+        with _faq_lock:
+            _faq_index = (versions, index)
+    return index
+
+
+def _best_title_match(words, entries):
+    """The entry whose title the message mentions most completely, if any."""
+    best, best_coverage = None, 0
+    for entry in entries:
+        title_words = entry['keywords']
+        if not title_words:
+            continue
+        overlap = len(title_words & words)
+        coverage = overlap / len(title_words)
+        if overlap >= min(2, len(title_words)) and coverage >= 0.6 and coverage > best_coverage:
+            best, best_coverage = entry, coverage
+    return best
+
+
+def _campaign_names(index, limit=3):
+    return ', '.join(f'“{campaign["title"]}”' for campaign in index['campaigns'][:limit])
+
+
+def _answer_join(index, campaign, match, user):
+    if match.group('title') and not campaign:
+        # "how do I join <something>" that isn't one of our campaigns
+        return None
+    if campaign:
+        return (
+            f'To join “{campaign["title"]}”, open {campaign["url"]} while logged in and press '
+            f'"Join Campaign". It runs until {campaign["ends"]}. 🌱'
+        )
+    answer = (
+        f'Browse our campaigns at {reverse("campaigns:campaign_list")}, open one and press '
+        f'"Join Campaign" (you need to be logged in).'
+    )
+    if index['campaigns']:
+        answer += f' Running now: {_campaign_names(index)}. 🌱'
+    return answer
+
+
+def _answer_running(index, campaign, match, user):
+    if not index['campaigns']:
+        return f'There are no campaigns running right now. Check back soon at {reverse("campaigns:campaign_list")}! 🌿'
+    return (
+        f'Campaigns running now: {_campaign_names(index, limit=5)}. '
+        f'See them all at {reverse("campaigns:campaign_list")}. 🌱'
+    )
+
+
+def _answer_suggest(index, campaign, match, user):
+    return (
+        f'Have an idea? Suggest a campaign at {reverse("campaigns:campaign_suggest")} '
+        f'and our team will review it. 💡'
+    )
+
+
+def _answer_write(index, campaign, match, user):
+    if getattr(user, 'is_staff', False):
+        return f'You can write an article at {reverse("articles:article_create")}. ✍️'
+    return (
+        f'Articles are written by the EcoAware PH team; you can read them all at '
+        f'{reverse("articles:article_list")}. Have an idea for a campaign instead? '
+        f'Suggest it at {reverse("campaigns:campaign_suggest")}. ✍️'
+    )
+
+
+def _answer_find_articles(index, campaign, match, user):
+    return (
+        f'Browse all articles at {reverse("articles:article_list")}, '
+        f'or search them at {reverse("articles:article_search")}. 📚'
+    )
+
+
+def _answer_article(index, campaign, match, user):
+    article = _best_title_match(_keywords(match.group('title')), index['articles'])
+    if not article:
+        # A topic rather than one of our articles; the model can help with that
+        return None
+    return f'You can read “{article["title"]}” at {article["url"]}. 📚'
+
+
+def _answer_register(index, campaign, match, user):
+    return f'Create your free account at {reverse("users:register")}, then log in to join campaigns. 🌏'
+
+
+def _answer_login(index, campaign, match, user):
+    return f'Log in at {reverse("users:login")}. 🔑'
+
+
+def _answer_password(index, campaign, match, user):
+    return f'Change your password at {reverse("users:password_change")} while logged in. 🔒'
+
+
+# Navigation questions only: each pattern must match the whole normalized
+# message, so "what activities can I do to reduce plastic waste?" or "how
+# do I write a good blog post about recycling?" go to the model.
+ASK = r'(how (do|can|could|should) i|how to|where (do|can) i|can i|i (want|would like) to)'
+THE = r'((a|an|the|this|your|all|one of your|the current|the active|the ongoing|the upcoming) )?'
+CAMPAIGN_WORDS = r'(campaigns?|events?|cleanups?|drives?)'
+ARTICLE_WORDS = r'(articles?|posts?|stor(y|ies)|blogs?)'
+ON_SITE = r'( (here|on (this site|the site|ecoaware( ph)?)))?'
+
+# (regex for the whole normalized message, answer builder); first match
+# wins. A builder may return None to pass the question on to the model.
+INTENTS = [
+    (re.compile(
+        rf'{ASK} (join|participate in|volunteer (for|in|at)|sign up for|register for|enroll in) '
+        rf'({THE}{CAMPAIGN_WORDS}{ON_SITE}|(?P<title>.+))'
+    ), _answer_join),
+    (re.compile(rf'{ASK} (suggest|propose|start|organi[sz]e|create) {THE}(new )?{CAMPAIGN_WORDS}{ON_SITE}'), _answer_suggest),
+    (re.compile(
+        rf'((what|which) {CAMPAIGN_WORDS} (are|is) (there|running|active|open|available|happening)( now| right now| today)?'
+        rf'|are there any (current |active |ongoing |upcoming )?{CAMPAIGN_WORDS}( running)?( now| right now)?'
+        rf'|(where|how) (can|do) i (see|find|view|browse) {THE}{CAMPAIGN_WORDS}{ON_SITE}'
+        rf'|(show|list) (me )?{THE}{CAMPAIGN_WORDS})'
+    ), _answer_running),
+    (re.compile(rf'{ASK} (write|publish|post|submit|contribute) {THE}(new )?{ARTICLE_WORDS}{ON_SITE}'), _answer_write),
+    (re.compile(
+        rf'((where|how) (can|do) i (find|read|browse|see|search) {THE}{ARTICLE_WORDS}{ON_SITE}'
+        rf'|(show|list|search) (me )?{THE}{ARTICLE_WORDS})'
+    ), _answer_find_articles),
+    (re.compile(
+        rf'({ASK} (find|read|see|open)|(show|open)( me)?|is there) {THE}{ARTICLE_WORDS} '
+        rf'((about|on|called|titled|named) )?(?P<title>.+)'
+    ), _answer_article),
+    (re.compile(rf'({ASK} )?(sign ?up|register|create (an )?account|make (an )?account){ON_SITE}'), _answer_register),
+    (re.compile(rf'({ASK} )?(log ?in|sign ?in)( to my account)?{ON_SITE}'), _answer_login),
+    (re.compile(rf'({ASK} )?(change|reset|recover) (my )?password|i forgot (my )?password'), _answer_password),
+]
+
+
+def match_faq(message, user=None):
+    """A canned answer for a site-navigation question, or None."""
+    normalized = normalize_prompt(message)
+    if not normalized or len(normalized.split()) > MAX_FAQ_WORDS:
+        return None
+
+    for pattern, answer in INTENTS:
+        match = pattern.fullmatch(normalized)
+        if match:
+            index = faq_index()
+            campaign = _best_title_match(_keywords(normalized), index['campaigns'])
+            return answer(index, campaign, match, user)
+    return None
+
+
+def answer_locally(message, user=None):
+    """
+    ``(source, answer)`` from the FAQ or the answer cache, or
+    ``(None, None)`` if the model has to be asked. Hits are counted.
+    ``user`` tailors FAQ answers to what they are allowed to do.
+    """
+    started = time.monotonic()
+    answer = match_faq(message, user)
+    if answer is not None:
+        reference = chat_stats.typical_model_latency()
+        saved = max(reference - (time.monotonic() - started), 0) if reference else None
+        chat_stats.record('faq', saved)
+        return 'faq', answer
+
+    hit = answers.get(message)
+    if hit is not None:
+        answer, model_latency = hit
+        chat_stats.record('cache', max(model_latency - (time.monotonic() - started), 0))
+        return 'cache', answer
+    return None, None
+
+
+# =========================================================
+# HIT RATES AND LATENCY SAVED
+# =========================================================
+# Same scheme as core.cache.CacheStats: counted in-process, pushed to the
+# shared counters every few seconds. Latency samples are merged into a
+# bounded window in the state cache; a concurrent push can drop a batch,
+# which is fine for a percentile.
+
+_CHAT_SAMPLES_KEY = 'chat-stats:samples:{}'
+
+
+class ChatStats:
+    PUSH_INTERVAL = 5
+    SAMPLE_WINDOW = 1000
+    SOURCES = ('faq', 'cache', 'model')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(int)
+        self._samples = {'saved': [], 'model': []}
+        self._recent_model = deque(maxlen=200)
+        self._last_push = time.monotonic()
+        self._shared = SharedCounters('chat-stats')
+
+    def record(self, source, seconds=None):
+        """Count one answer. ``seconds`` is time saved for hits, round-trip time for model calls."""
+        with self._lock:
+            self._counts[source] += 1
+            if seconds is not None:
+                self._samples['model' if source == 'model' else 'saved'].append(seconds)
+                if source == 'model':
+                    self._recent_model.append(seconds)
+            due = time.monotonic() - self._last_push >= self.PUSH_INTERVAL
+        if due:
+            self.push()
+
+    def typical_model_latency(self):
+        """Median model round trip seen by this process; the yardstick for FAQ answers."""
+        with self._lock:
+            return _percentile(self._recent_model, 50)
+
+    def push(self):
+        with self._lock:
+            counts = dict(self._counts)
+            samples = {kind: values for kind, values in self._samples.items() if values}
+            self._counts.clear()
+            self._samples = {'saved': [], 'model': []}
+            self._last_push = time.monotonic()
+
+        if counts:
+            self._shared.add(counts)
+        for kind, values in samples.items():
+            key = _CHAT_SAMPLES_KEY.format(kind)
+            window = (state.get(key) or []) + values
+            state.set(key, window[-self.SAMPLE_WINDOW:], timeout=None)
+
+    def snapshot(self):
+        self.push()
+        shared = self._shared.totals()
+        counts = {source: shared[source] for source in self.SOURCES}
+        total = sum(counts.values())
+        saved = state.get(_CHAT_SAMPLES_KEY.format('saved')) or []
+        model = state.get(_CHAT_SAMPLES_KEY.format('model')) or []
+
+        def ms(value):
+            return round(value * 1000) if value is not None else None
+
+        return {
+            'requests': total,
+            'answered_by': counts,
+            'hit_rate': round((counts['faq'] + counts['cache']) / total, 4) if total else None,
+            'faq_hit_rate': round(counts['faq'] / total, 4) if total else None,
+            'cache_hit_rate': round(counts['cache'] / total, 4) if total else None,
+            'saved_ms': {'p50': ms(_percentile(saved, 50)), 'p95': ms(_percentile(saved, 95)), 'samples': len(saved)},
+            'model_ms': {'p50': ms(_percentile(model, 50)), 'p95': ms(_percentile(model, 95)), 'samples': len(model)},
+        }
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+            self._samples = {'saved': [], 'model': []}
+        self._shared.reset()
+        state.delete_many([_CHAT_SAMPLES_KEY.format(kind) for kind in ('saved', 'model')])
+
+
+chat_stats = ChatStats()
@@ -0,0 +1,177 @@
+import json
+import re
+
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+
+# =========================================================
+# QUERY PLAN AUDIT
+# =========================================================
+# Replays the benchmark scenarios (core.benchmarks) and the hot queries
+# run outside requests, EXPLAINs every SELECT they send to a hot table,
+# and reports plans that read a whole table or sort rows in memory, i.e.
+# queries without a supporting index.
+#
+# - SQLite: EXPLAIN QUERY PLAN; "SCAN <table>" without an index and
+#   "USE TEMP B-TREE FOR ... ORDER BY" are problems.
+# - PostgreSQL: EXPLAIN (FORMAT JSON) with seq scans and sorts disabled
+#   for the transaction, so a "Seq Scan" or "Sort" node left in the plan
+#   means the planner had no index to use, whatever the table size.
+#
+# Run by core.tests on the ci dataset and by ``manage.py benchmark
+# --explain`` against a real database.
+
+HOT_TABLES = {
+    'articles_article', 'articles_comment', 'campaigns_campaign',
+    'campaigns_campaign_participants', 'campaigns_campaignsuggestion', 'users',
+    'core_metricbucket',
+}
+
+# Plans accepted as they are: (table, 'scan' | 'sort') -> pattern the SQL matches
+ACCEPTED = {
+    # Replies for one page of comments: a handful of rows fetched by parent
+    # id, merged into one order across several parents
+    ('articles_comment', 'sort'): re.compile(r'"parent_id" IN \('),
+}
+
+_SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?! USING)')
+_SQLITE_SORT = re.compile(r'USE TEMP B-TREE FOR (?:RIGHT PART OF |LAST TERM OF )?ORDER BY')
+_SQLITE_TABLE = re.compile(r'^(?:SCAN|SEARCH) (?:TABLE )?(\w+)')
+_FROM_TABLE = re.compile(r'(?:FROM|JOIN) "?(\w+)"?')
+
+
+def tables_in(sql):
+    return set(_FROM_TABLE.findall(sql))
+
+
+def _accepted(table, kind, sql):
+    pattern = ACCEPTED.get((table, kind))
+    return pattern is not None and pattern.search(sql)
+
+
+def _sqlite_problems(sql):
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        details = [row[3] for row in cursor.fetchall()]
+    problems = []
+    tables = [match.group(1) for match in map(_SQLITE_TABLE.match, details) if match]
+    for detail in details:
+        scan = _SQLITE_SCAN.match(detail)
+        if scan and scan.group(1) in HOT_TABLES and not _accepted(scan.group(1), 'scan', sql):
+            problems.append(f'full scan of {scan.group(1)}')
+        if _SQLITE_SORT.search(detail):
+            table = tables[0] if tables else '?'
+            if table in HOT_TABLES and not _accepted(table, 'sort', sql):
+                problems.append(f'in-memory sort on {table}')
+    return problems
+
+
+def _walk(node):
+    yield node
+    for child in node.get('Plans', ()):
+        yield from _walk(child)
+
+
+def _postgresql_problems(sql):
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute('SET LOCAL enable_sort = off')
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    problems = []
+    nodes = list(_walk(plan[0]['Plan']))
+    for node in nodes:
+        table = node.get('Relation Name')
+        if node['Node Type'] == 'Seq Scan' and table in HOT_TABLES and not _accepted(table, 'scan', sql):
+            problems.append(f'full scan of {table}')
+        if node['Node Type'] in ('Sort', 'Incremental Sort'):
+            below = [child.get('Relation Name') for child in _walk(node) if child.get('Relation Name')]
+            table = below[0] if below else '?'
+            if table in HOT_TABLES and not _accepted(table, 'sort', sql):
+                problems.append(f'in-memory sort on {table}')
+    return problems
+
+
+def plan_problems(sql):
+    """What's wrong with the plan for one SELECT statement (empty if nothing)."""
+    if connection.vendor == 'postgresql':
+        return _postgresql_problems(sql)
+    if connection.vendor == 'sqlite':
+        return _sqlite_problems(sql)
+    return []
+
+
+def audit_queries(queries):
+    """``[(sql, problems)]`` for the captured SELECTs on hot tables that have problems."""
+    findings = []
+    seen = set()
+    for query in queries:
+        sql = query['sql']
+        if not sql.lstrip().upper().startswith('SELECT') or sql in seen:
+            continue
+        seen.add(sql)
+        if not tables_in(sql) & HOT_TABLES:
+            continue
+        problems = plan_problems(sql)
+        if problems:
+            findings.append((sql, problems))
+    return findings
+
+
+def _home_feed():
+    from .models import HomeFeed
+    HomeFeed.rebuild()
+
+
+def _faq_index():
+    from . import ecobot
+    ecobot.build_faq_index()
+
+
+def _admin_snapshot():
+    # The dashboard scenario is mostly served from its cached snapshot
+    from users.stats import build_admin_snapshot
+    build_admin_snapshot()
+
+
+BACKGROUND = {
+    'home_feed': _home_feed,
+    'faq_index': _faq_index,
+    'admin_snapshot': _admin_snapshot,
+}
+
+
+def audit_background():
+    """Run each query source in BACKGROUND once; returns ``{name: [(sql, problems)]}``."""
+    report = {}
+    for name, run in BACKGROUND.items():
+        with CaptureQueriesContext(connection) as captured:
+            run()
+        report[name] = audit_queries(captured.captured_queries)
+    return report
+
+
+def audit_scenarios(only=None, seed=0):
+    """Run each benchmark scenario once; returns ``{scenario: [(sql, problems)]}``."""
+    from . import benchmarks
+
+    scenarios = [scenario for scenario in benchmarks.SCENARIOS if not only or scenario.name in only]
+    workload = benchmarks.Workload(seed)
+    clients = {}
+    for staff, username in ((False, benchmarks.BENCH_READER), (True, benchmarks.BENCH_STAFF)):
+        clients[staff] = Client()
+        clients[staff].force_login(benchmarks.bench_user(username, staff))
+
+    report = {}
+    with benchmarks.benchmark_settings():
+        for scenario in scenarios:
+            method, path, data = scenario.build_request(workload)
+            kwargs = {'content_type': 'application/json'} if method == 'post' and isinstance(data, str) else {}
+            with CaptureQueriesContext(connection) as captured:
+                getattr(clients[scenario.staff], method)(path, data, **kwargs)
+            report[scenario.name] = audit_queries(captured.captured_queries)
+    return report
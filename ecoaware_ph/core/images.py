@@ -0,0 +1,150 @@
+import io
+import logging
+import os
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+from .jobs import task
+
+logger = logging.getLogger(__name__)
+
+
+# =========================================================
+# IMAGE DERIVATIVES
+# =========================================================
+# Uploaded originals (Article.featured_image, Campaign.image) are resized
+# into AVIF, WebP and JPEG renditions at IMAGE_RENDITION_WIDTHS, written
+# back through the field's own storage (local MEDIA_ROOT or Cloudinary).
+# The result is stored on the model in ``<field>_renditions`` as
+#
+#   {'source': 'articles/photo.jpg', 'width': 2400, 'height': 1600,
+#    'src': <640w JPEG url>, 'srcset': '<url> 320w, <url> 640w, ...',
+#    'sources': [{'type': 'image/avif', 'srcset': ...}, {'type': 'image/webp', ...}],
+#    'files': [every derivative's storage name]}
+#
+# so card templates can render a <picture> without touching storage
+# (see templates/atoms/responsive_image.html). Resizing runs as a queued
+# job (core.jobs); until it finishes the templates fall back to the
+# original.
+
+# (format key, Pillow format, MIME type, save options); JPEG last as the <img> fallback
+FORMATS = (
+    ('avif', 'AVIF', 'image/avif', {'quality': 60}),
+    ('webp', 'WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    ('jpg', 'JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+# Width served as <img src> to browsers that ignore srcset
+FALLBACK_WIDTH = 640
+
+
+def supported_formats():
+    return [fmt for fmt in FORMATS if fmt[0] == 'jpg' or features.check(fmt[1].lower())]
+
+
+def rendition_widths(original_width):
+    widths = [width for width in settings.IMAGE_RENDITION_WIDTHS if width < original_width]
+    largest = min(original_width, max(settings.IMAGE_RENDITION_WIDTHS))
+    if largest not in widths:
+        widths.append(largest)
+    return widths
+
+
+def _rendition_name(source_name, width, extension):
+    directory, filename = os.path.split(source_name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join('renditions', directory, f'{stem}-{width}w.{extension}').replace(os.sep, '/')
+
+
+def build_renditions(field_file):
+    """Generate and store every derivative of ``field_file``; returns the renditions dict."""
+    storage = field_file.storage
+    with field_file.open('rb') as handle:
+        original = Image.open(handle)
+        original.load()
+    image = ImageOps.exif_transpose(original)
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+    width, height = image.size
+
+    files = []
+    srcsets = {}
+    fallback = None
+    for width_px in rendition_widths(width):
+        height_px = max(1, round(height * width_px / width))
+        resized = image.resize((width_px, height_px), Image.Resampling.LANCZOS)
+        for extension, pil_format, mime, options in supported_formats():
+            frame = resized.convert('RGB') if pil_format == 'JPEG' else resized
+            buffer = io.BytesIO()
+            frame.save(buffer, pil_format, **options)
+            name = storage.save(_rendition_name(field_file.name, width_px, extension), ContentFile(buffer.getvalue()))
+            files.append(name)
+            url = storage.url(name)
+            srcsets.setdefault(mime, []).append(f'{url} {width_px}w')
+            if pil_format == 'JPEG' and (fallback is None or width_px <= FALLBACK_WIDTH):
+                fallback = url
+
+    return {
+        'source': field_file.name,
+        'width': width,
+        'height': height,
+        'src': fallback,
+        'srcset': ', '.join(srcsets.pop('image/jpeg')),
+        'sources': [{'type': mime, 'srcset': ', '.join(entries)} for mime, entries in srcsets.items()],
+        'files': files,
+    }
+
+
+def delete_files(storage, names):
+    for name in names:
+        try:
+            storage.delete(name)
+        except Exception:
+            logger.warning('Could not delete rendition %s', name, exc_info=True)
+
+
+def process_image(model_label, pk, field_name, force=False):
+    """Bring ``<field>_renditions`` in line with the current upload of one object."""
+    model = apps.get_model(model_label)
+    instance = model._default_manager.filter(pk=pk).first()
+    if instance is None:
+        return
+
+    field_file = getattr(instance, field_name)
+    renditions_field = f'{field_name}_renditions'
+    previous = getattr(instance, renditions_field) or {}
+    if not force and (field_file.name or '') == (previous.get('source') or ''):
+        return
+
+    renditions = build_renditions(field_file) if field_file else {}
+    setattr(instance, renditions_field, renditions)
+    instance.save(update_fields=[renditions_field])
+    delete_files(field_file.storage, [name for name in previous.get('files', []) if name not in renditions.get('files', [])])
+
+
+# =========================================================
+# QUEUED JOBS
+# =========================================================
+@task(priority=50)
+def generate_renditions(model_label, pk, field_name, force=False):
+    process_image(model_label, pk, field_name, force=force)
+
+
+@task(priority=200)
+def delete_renditions(model_label, field_name, names):
+    storage = apps.get_model(model_label)._meta.get_field(field_name).storage
+    delete_files(storage, names)
+
+
+def schedule_renditions(instance, field_name):
+    generate_renditions.enqueue(instance._meta.label, instance.pk, field_name)
+
+
+def schedule_cleanup(instance, field_name):
+    """Remove the derivatives of a deleted object."""
+    files = (getattr(instance, f'{field_name}_renditions') or {}).get('files', [])
+    if files:
+        delete_renditions.enqueue(instance._meta.label, field_name, files)
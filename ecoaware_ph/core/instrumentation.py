@@ -0,0 +1,290 @@
+import contextvars
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+logger = logging.getLogger('core.requests')
+
+
+# =========================================================
+# PER-REQUEST INSTRUMENTATION
+# =========================================================
+# RequestMetricsMiddleware measures every request:
+#
+# - queries / SQL time:  a wrapper on each database connection
+#                        (installed from core.signals on connect)
+# - template time:       InstrumentedTemplates, the DjangoTemplates backend
+#                        configured in settings.TEMPLATES; includes are part
+#                        of their parent's time
+# - cache hits/misses:   lookups through core.cache (cached, cached_fragment)
+#
+# and reports them as a Server-Timing header (visible in the browser's
+# network panel; METRICS_SERVER_TIMING, on with DEBUG), one JSON log line
+# on the "core.requests" logger and, with METRICS_COLLECT, in-process
+# Prometheus series served at /ops/metrics/. The measurements travel in a
+# context variable, so they follow the request through sync_to_async into
+# async views.
+#
+# For streamed responses the numbers stop when the headers are sent.
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = ('started', 'queries', 'sql_time', 'template_time', 'cache_hits', 'cache_misses')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.sql_time += time.perf_counter() - started
+
+
+def install_query_recorder(connection):
+    # First in line, so connection.execute_wrapper() blocks still pop their own wrapper
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def record_cache_lookup(hit):
+    metrics = _current.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics = _current.get()
+            if metrics is not None:
+                metrics.template_time += time.perf_counter() - started
+
+
+class InstrumentedTemplates(DjangoTemplates):
+    """DjangoTemplates whose top-level renders count towards the request's template time."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+# =========================================================
+# MIDDLEWARE
+# =========================================================
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match._func_path
+
+
+def server_timing(metrics, total):
+    return ', '.join([
+        f'db;desc="{metrics.queries} queries";dur={metrics.sql_time * 1000:.1f}',
+        f'tpl;dur={metrics.template_time * 1000:.1f}',
+        f'cache;desc="{metrics.cache_hits} hits / {metrics.cache_misses} misses"',
+        f'total;dur={total * 1000:.1f}',
+    ])
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        total = metrics.elapsed()
+        view = _view_name(request)
+        if settings.METRICS_SERVER_TIMING:
+            response['Server-Timing'] = server_timing(metrics, total)
+        if settings.METRICS_COLLECT:
+            registry.observe(view, request.method, response.status_code, metrics, total)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                'event': 'request',
+                'method': request.method,
+                'path': request.path,
+                'view': view,
+                'status': response.status_code,
+                'duration_ms': round(total * 1000, 1),
+                'queries': metrics.queries,
+                'sql_ms': round(metrics.sql_time * 1000, 1),
+                'template_ms': round(metrics.template_time * 1000, 1),
+                'cache_hits': metrics.cache_hits,
+                'cache_misses': metrics.cache_misses,
+            }))
+        return response
+
+
+# =========================================================
+# PROMETHEUS SERIES
+# =========================================================
+# Kept per process and reset on restart; Prometheus scrapes each worker's
+# totals and handles resets itself. Series are labelled by URL name, so
+# the label set stays as small as the URL conf.
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+    return ','.join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+
+def _format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    PREFIX = 'ecoaware'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = defaultdict(int)        # (view, method, status) -> count
+        self.durations = {}                     # view -> Histogram (seconds)
+        self.queries = {}                       # view -> Histogram (queries per request)
+        self.sql_seconds = defaultdict(float)   # view -> total
+        self.template_seconds = defaultdict(float)
+        self.cache_lookups = defaultdict(int)   # (view, 'hit'|'miss') -> count
+
+    def observe(self, view, method, status, metrics, total):
+        with self._lock:
+            self.requests[(view, method, status)] += 1
+            self.durations.setdefault(view, Histogram(DURATION_BUCKETS)).observe(total)
+            self.queries.setdefault(view, Histogram(QUERY_BUCKETS)).observe(metrics.queries)
+            self.sql_seconds[view] += metrics.sql_time
+            self.template_seconds[view] += metrics.template_time
+            self.cache_lookups[(view, 'hit')] += metrics.cache_hits
+            self.cache_lookups[(view, 'miss')] += metrics.cache_misses
+
+    def _histogram_lines(self, name, help_text, histograms):
+        lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for view, histogram in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{_labels(view=view, le=bound)}}} {cumulative}')
+            lines.append(f'{name}_bucket{{{_labels(view=view, le="+Inf")}}} {histogram.count}')
+            lines.append(f'{name}_sum{{{_labels(view=view)}}} {_format_number(histogram.sum)}')
+            lines.append(f'{name}_count{{{_labels(view=view)}}} {histogram.count}')
+        return lines
+
+    def _counter_lines(self, name, help_text, samples):
+        lines = [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for labels, value in sorted(samples, key=lambda sample: [str(part) for part in sample[0].values()]):
+            lines.append(f'{name}{{{_labels(**labels)}}} {_format_number(value)}')
+        return lines
+
+    def render(self):
+        """The registry in Prometheus text exposition format (version 0.0.4)."""
+        prefix = self.PREFIX
+        with self._lock:
+            lines = self._counter_lines(
+                f'{prefix}_requests_total', 'Requests handled, by view, method and status.',
+                [({'view': view, 'method': method, 'status': status}, count)
+                 for (view, method, status), count in self.requests.items()],
+            )
+            lines += self._histogram_lines(
+                f'{prefix}_request_duration_seconds', 'Time until the response was returned.', self.durations,
+            )
+            lines += self._histogram_lines(
+                f'{prefix}_request_queries', 'Database queries per request.', self.queries,
+            )
+            lines += self._counter_lines(
+                f'{prefix}_db_seconds_total', 'Time spent running SQL.',
+                [({'view': view}, seconds) for view, seconds in self.sql_seconds.items()],
+            )
+            lines += self._counter_lines(
+                f'{prefix}_template_seconds_total', 'Time spent rendering templates.',
+                [({'view': view}, seconds) for view, seconds in self.template_seconds.items()],
+            )
+            lines += self._counter_lines(
+                f'{prefix}_cache_lookups_total', 'Namespaced cache lookups, by result.',
+                [({'view': view, 'result': result}, count) for (view, result), count in self.cache_lookups.items()],
+            )
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,252 @@
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+# =========================================================
+# DATABASE-BACKED JOB QUEUE
+# =========================================================
+# Slow side effects are queued as core.models.Job rows and run by
+# ``manage.py runworker``, so they need nothing but the database we
+# already have. Enqueueing inside a transaction is transactional: the
+# job only becomes visible if the surrounding writes commit.
+#
+#   @task(priority=10)
+#   def flush_view_counts(pairs): ...
+#
+#   flush_view_counts.enqueue([[article_id, hits], ...])
+#
+# Arguments must be JSON-serialisable. Failed jobs are retried with
+# exponential backoff until max_attempts; every finished job leaves a
+# JobResult row. With JOB_QUEUE_EAGER = True jobs run in-process as soon
+# as the enqueueing transaction commits (tests, quick scripts).
+
+_registry = {}
+
+
+class Task:
+    def __init__(self, func, priority, max_attempts):
+        self.func = func
+        self.name = f'{func.__module__}.{func.__qualname__}'
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, priority=None, delay=0, **kwargs):
+        """Queue a call; returns the Job (or None when running eagerly)."""
+        from .models import Job
+
+        if settings.JOB_QUEUE_EAGER:
+            transaction.on_commit(lambda: _run_eagerly(self, args, kwargs))
+            return None
+        return Job.objects.create(
+            name=self.name,
+            args=list(args),
+            kwargs=kwargs,
+            priority=self.priority if priority is None else priority,
+            max_attempts=self.max_attempts,
+            run_after=timezone.now() + timedelta(seconds=delay),
+        )
+
+
+def task(func=None, *, priority=100, max_attempts=3):
+    """Register ``func`` as a queueable task. Lower priorities run first."""
+    def register(func):
+        registered = Task(func, priority, max_attempts)
+        _registry[registered.name] = registered
+        return registered
+    return register(func) if func is not None else register
+
+
+def get_task(name):
+    """Look up a task by name, importing its module on first use."""
+    if name not in _registry:
+        module = name.rsplit('.', 1)[0]
+        import_module(module)
+    return _registry[name]
+
+
+def _run_eagerly(registered, args, kwargs):
+    try:
+        registered(*args, **kwargs)
+    except Exception:
+        logger.exception('Job %s failed', registered.name)
+
+
+def _jsonable(value):
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return repr(value)
+
+
+# =========================================================
+# WORKER
+# =========================================================
+class Worker:
+    """
+    Claims ready jobs one at a time, highest priority first. On PostgreSQL
+    the claim uses SELECT ... FOR UPDATE SKIP LOCKED; elsewhere a
+    conditional UPDATE makes sure only one worker wins each row.
+    """
+    STALE_CHECK_INTERVAL = 60
+    PRUNE_INTERVAL = 3600
+
+    def __init__(self, name=None, sleep=1.0):
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.sleep = sleep
+        self._stopping = False
+        self._last_stale_check = 0
+        self._last_prune = 0
+
+    def stop(self, *args):
+        self._stopping = True
+
+    def claim(self):
+        from .models import Job
+
+        now = timezone.now()
+        ready = Job.objects.filter(status=Job.QUEUED, run_after__lte=now).order_by('priority', 'run_after', 'id')
+        claim = {
+            'status': Job.RUNNING,
+            'locked_by': self.name,
+            'locked_at': now,
+            'attempts': F('attempts') + 1,
+        }
+
+        if connection.features.has_select_for_update_skip_locked:
+            with transaction.atomic():
+                pk = ready.select_for_update(skip_locked=True).values_list('pk', flat=True).first()
+                if pk is None:
+                    return None
+                Job.objects.filter(pk=pk).update(**claim)
+            return Job.objects.get(pk=pk)
+
+        for pk in ready.values_list('pk', flat=True)[:10]:
+            if Job.objects.filter(pk=pk, status=Job.QUEUED).update(**claim):
+                return Job.objects.get(pk=pk)
+        return None
+
+    def run_one(self):
+        """Run the next ready job. Returns False if there was none."""
+        job = self.claim()
+        if job is None:
+            return False
+
+        started = timezone.now()
+        try:
+            result = get_task(job.name)(*job.args, **job.kwargs)
+        except Exception:
+            error = traceback.format_exc()
+            if job.attempts < job.max_attempts:
+                self._retry(job, error)
+            else:
+                logger.error('Job %s #%s failed after %d attempts', job.name, job.pk, job.attempts)
+                self._finish(job, 'failed', started, error=error)
+        else:
+            self._finish(job, 'done', started, result=_jsonable(result))
+        return True
+
+    def _retry(self, job, error):
+        from .models import Job
+
+        backoff = settings.JOB_RETRY_BACKOFF * 2 ** (job.attempts - 1)
+        logger.warning('Job %s #%s failed (attempt %d), retrying in %ss', job.name, job.pk, job.attempts, backoff)
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.QUEUED,
+            run_after=timezone.now() + timedelta(seconds=backoff),
+            locked_by='',
+            locked_at=None,
+            last_error=error,
+        )
+
+    def _finish(self, job, status, started, result=None, error=''):
+        from .models import JobResult
+
+        with transaction.atomic():
+            JobResult.objects.create(
+                job_id=job.pk,
+                name=job.name,
+                status=status,
+                args=job.args,
+                kwargs=job.kwargs,
+                attempts=job.attempts,
+                result=result,
+                error=error,
+                worker=self.name,
+                enqueued_at=job.created_at,
+                started_at=started,
+                finished_at=timezone.now(),
+            )
+            job.delete()
+
+    def requeue_stale(self):
+        """Put back jobs whose worker died mid-run."""
+        from .models import Job
+
+        cutoff = timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+        count = Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff).update(
+            status=Job.QUEUED, locked_by='', locked_at=None,
+        )
+        if count:
+            logger.warning('Requeued %d stale jobs', count)
+        return count
+
+    def prune_results(self):
+        from .models import JobResult
+
+        cutoff = timezone.now() - timedelta(days=settings.JOB_RESULT_RETENTION_DAYS)
+        return JobResult.objects.filter(finished_at__lt=cutoff).delete()[0]
+
+    def compact_analytics(self):
+        from . import analytics
+
+        folded = analytics.compact()
+        if folded:
+            logger.info('Compacted %d hourly analytics buckets', folded)
+        return folded
+
+    def _housekeeping(self):
+        now = time.monotonic()
+        if now - self._last_stale_check >= self.STALE_CHECK_INTERVAL:
+            self._last_stale_check = now
+            self.requeue_stale()
+        if now - self._last_prune >= self.PRUNE_INTERVAL:
+            self._last_prune = now
+            self.prune_results()
+            self.compact_analytics()
+
+    def run(self, burst=False):
+        """Process jobs until stopped; with ``burst`` stop once the queue is empty."""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+        processed = 0
+        while not self._stopping:
+            close_old_connections()
+            self._housekeeping()
+            if self.run_one():
+                processed += 1
+                continue
+            if burst:
+                break
+            time.sleep(self.sleep)
+        return processed
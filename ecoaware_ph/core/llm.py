@@ -0,0 +1,99 @@
+import asyncio
+import weakref
+
+from django.conf import settings
+
+
+# =========================================================
+# ECOBOT LLM CLIENT
+# =========================================================
+# One AsyncGroq client per event loop, so every chat request in a worker
+# shares the same HTTP connection pool instead of opening a new TLS
+# connection per message. Under ASGI that is one client per worker
+# process; under WSGI each request gets a short-lived loop of its own.
+#
+# Every call is bounded by CHAT_TIMEOUT seconds end to end. Streaming
+# replies apply the remaining budget to each chunk, so a stalled upstream
+# can't hold a connection open past the deadline.
+
+SYSTEM_PROMPT = (
+    "You are EcoBot, the friendly AI assistant for EcoAware PH. "
+    "Your goal is to help users with environmental questions, recycling tips, and navigating the site. "
+    "Keep answers concise, encouraging, and emoji-friendly."
+)
+
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_client():
+    """The shared AsyncGroq client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    config = (settings.GROQ_API_KEY, settings.GROQ_BASE_URL)
+    entry = _clients.get(loop)
+    if entry is None or entry[0] != config:
+        from groq import AsyncGroq
+
+        client = AsyncGroq(
+            api_key=settings.GROQ_API_KEY,
+            base_url=settings.GROQ_BASE_URL,
+            timeout=settings.CHAT_TIMEOUT,
+            # A retry would blow the caller's deadline; fail fast instead
+            max_retries=0,
+        )
+        entry = _clients[loop] = (config, client)
+    return entry[1]
+
+
+def _messages(user_message):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_message},
+    ]
+
+
+async def complete_reply(user_message):
+    """The full reply as one string. Raises TimeoutError past CHAT_TIMEOUT."""
+    completion = await asyncio.wait_for(
+        get_client().chat.completions.create(
+            messages=_messages(user_message),
+            model=settings.CHAT_MODEL,
+        ),
+        timeout=settings.CHAT_TIMEOUT,
+    )
+    return completion.choices[0].message.content or ''
+
+
+async def stream_reply(user_message):
+    """
+    Yield the reply as it is generated, one text fragment at a time.
+    Raises TimeoutError once CHAT_TIMEOUT has elapsed since the call.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.CHAT_TIMEOUT
+
+    def remaining():
+        left = deadline - loop.time()
+        if left <= 0:
+            raise TimeoutError
+        return left
+
+    stream = await asyncio.wait_for(
+        get_client().chat.completions.create(
+            messages=_messages(user_message),
+            model=settings.CHAT_MODEL,
+            stream=True,
+        ),
+        timeout=remaining(),
+    )
+    chunks = stream.__aiter__()
+    try:
+        while True:
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), timeout=remaining())
+            except StopAsyncIteration:
+                break
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                yield text
+    finally:
+        await stream.close()
@@ -0,0 +1,84 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core import benchmarks, explain
+from core.seeding import SCALES, Seeder, require_scratch_database
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the main user journeys against the configured database (see core.benchmarks)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(SCALES), help='Seed a dataset of this size first, unless one is already there')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the dataset and the request mix')
+        parser.add_argument('--iterations', type=int, default=30, help='Timed requests per scenario')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per scenario, to fill caches')
+        parser.add_argument('--only', nargs='+', metavar='SCENARIO', help='Run just these scenarios')
+        parser.add_argument('--no-latency', action='store_true', help='Check query budgets only')
+        parser.add_argument('--output', help='Write the JSON report to this file')
+        parser.add_argument('--compare', help='Print changes against an earlier JSON report')
+        parser.add_argument('--explain', action='store_true', help='Also check every hot query plan for full scans and sorts')
+        parser.add_argument('--force', action='store_true', help='Run even with DEBUG off')
+
+    def handle(self, *args, **options):
+        # Scenarios write (campaign joins, bench-* users) and --scale seeds
+        require_scratch_database(options['force'])
+
+        known = {scenario.name for scenario in benchmarks.SCENARIOS}
+        unknown = set(options['only'] or ()) - known
+        if unknown:
+            raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown))} (choose from {", ".join(sorted(known))})')
+
+        if options['scale']:
+            if get_user_model().objects.filter(username__startswith='seed-user-').exists():
+                self.stdout.write('Seeded data found, not seeding again.')
+            else:
+                self.stdout.write(f"Seeding the {options['scale']} dataset...")
+                Seeder(SCALES[options['scale']], seed=options['seed'], log=self.stdout.write).run()
+
+        report = benchmarks.run_suite(
+            iterations=options['iterations'],
+            warmup=options['warmup'],
+            only=options['only'],
+            check_latency=not options['no_latency'],
+            seed=options['seed'],
+        )
+
+        for name, result in report['scenarios'].items():
+            latency = result['latency_ms']
+            line = f"{name:<24} queries {result['queries']['max']:>3}  p50 {latency['p50']:>8.2f}ms  p95 {latency['p95']:>8.2f}ms"
+            if result['passed']:
+                self.stdout.write(f'{line}  ok')
+            else:
+                self.stdout.write(self.style.ERROR(f"{line}  FAIL: {'; '.join(result['failures'])}"))
+
+        plan_problems = {}
+        if options['explain']:
+            plan_problems = {**explain.audit_scenarios(only=options['only'], seed=options['seed']), **explain.audit_background()}
+            self.stdout.write('')
+            for name, findings in plan_problems.items():
+                if not findings:
+                    self.stdout.write(f'{name:<24} plans ok')
+                for sql, problems in findings:
+                    self.stdout.write(self.style.ERROR(f"{name:<24} {'; '.join(problems)}: {sql}"))
+
+        if options['compare']:
+            with open(options['compare']) as handle:
+                previous = json.load(handle)
+            self.stdout.write('')
+            for line in benchmarks.compare_reports(previous, report):
+                self.stdout.write(line)
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2, sort_keys=True)
+                handle.write('\n')
+            self.stdout.write(f"Report written to {options['output']}.")
+
+        if not report['passed']:
+            raise CommandError('Some scenarios are over budget.')
+        if any(plan_problems.values()):
+            raise CommandError('Some hot queries are not served by an index.')
+        self.stdout.write(self.style.SUCCESS('All scenarios within budget.'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core import images
+from core.signals import IMAGE_FIELDS
+
+
+class Command(BaseCommand):
+    help = 'Generate missing image renditions for articles and campaigns (inline, not in the background pool)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate renditions that already exist')
+
+    def handle(self, *args, **options):
+        for model, field_name in IMAGE_FIELDS.items():
+            pending = model._default_manager.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            count = 0
+            for pk in pending.values_list('pk', flat=True).iterator():
+                try:
+                    images.process_image(model._meta.label, pk, field_name, force=options['force'])
+                    count += 1
+                except Exception as exc:
+                    self.stderr.write(f'{model._meta.label} {pk}: {exc}')
+            self.stdout.write(self.style.SUCCESS(f'Processed {count} {model._meta.verbose_name_plural}.'))
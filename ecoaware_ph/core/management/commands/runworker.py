@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.jobs import Worker
+
+# Caches that live on this host only. Jobs invalidate cache namespaces
+# (core.signals), which the web service never sees if it has its own.
+HOST_LOCAL_CACHES = (
+    'django.core.cache.backends.filebased.FileBasedCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (core.jobs) until stopped'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--burst', action='store_true', help='Exit once the queue is empty')
+        parser.add_argument('--sleep', type=float, default=1.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--name', help='Worker name recorded on claimed jobs (default host:pid)')
+        parser.add_argument(
+            '--same-host', action='store_true',
+            help="Run with a file cache; only right if the web processes share this host's CACHE_DIR",
+        )
+
+    def handle(self, *args, **options):
+        local = [alias for alias in ('default', 'state') if settings.CACHES[alias]['BACKEND'] in HOST_LOCAL_CACHES]
+        if local and not (settings.DEBUG or options['same_host']):
+            raise CommandError(
+                f"The {' and '.join(local)} cache is local to this host, so the cache invalidations "
+                f"jobs make would never reach the web service. Set REDIS_URL, or pass --same-host "
+                f"if the web processes share this host's CACHE_DIR."
+            )
+
+        worker = Worker(name=options['name'], sleep=options['sleep'])
+        self.stdout.write(f'Worker {worker.name} started.')
+        processed = worker.run(burst=options['burst'])
+        self.stdout.write(self.style.SUCCESS(f'Worker {worker.name} stopped after {processed} jobs.'))
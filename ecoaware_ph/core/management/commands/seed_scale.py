@@ -0,0 +1,48 @@
+import time
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.seeding import METHODS, SCALES, Seeder, require_scratch_database
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with a deterministic, production-sized dataset (see core.seeding)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(SCALES), default='small', help='Preset row counts (default small)')
+        for table in SCALES['full']:
+            parser.add_argument(f'--{table}', type=int, help=f'Override the number of {table}')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed gives the same data')
+        parser.add_argument('--anchor', type=date.fromisoformat, help='Date the generated history ends on (YYYY-MM-DD, default today)')
+        parser.add_argument('--method', choices=METHODS, help='How rows are written (default copy on PostgreSQL, executemany elsewhere)')
+        parser.add_argument('--batch-size', type=int, help=f'Rows per write (default {Seeder.BATCH_SIZE})')
+        parser.add_argument('--force', action='store_true', help='Run even with DEBUG off')
+
+    def handle(self, *args, **options):
+        require_scratch_database(options['force'])
+        if get_user_model().objects.filter(username__startswith='seed-user-').exists():
+            raise CommandError('Seeded data is already present; seed a fresh database to get reproducible data.')
+
+        counts = dict(SCALES[options['scale']])
+        for table in counts:
+            if options[table] is not None:
+                counts[table] = options[table]
+
+        try:
+            seeder = Seeder(
+                counts, seed=options['seed'], anchor=options['anchor'], method=options['method'],
+                batch_size=options['batch_size'], log=self.stdout.write,
+            )
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        self.stdout.write(f"Seeding {connection.vendor} with {seeder.method} (seed {options['seed']}, history to {seeder.anchor.date()})...")
+        started = time.monotonic()
+        seeder.run()
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {sum(counts.values())} rows in {time.monotonic() - started:.0f}s. '
+            f'Users are seed-user-<n>; give one a password with changepassword to log in as it.'
+        ))
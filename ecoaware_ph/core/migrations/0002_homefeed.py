@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HomeFeed',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('featured_articles', models.JSONField(default=list)),
+                ('recent_articles', models.JSONField(default=list)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_job_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=40)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('resolution', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('start', models.DateTimeField()),
+                ('count', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('resolution', 'hour')), fields=['start'], name='metric_bucket_hourly_idx')],
+                'constraints': [models.UniqueConstraint(fields=('metric', 'object_id', 'start', 'resolution'), name='metric_bucket_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def drop_home_feed(apps, schema_editor):
+    # Cards built before this migration have no article id; HomeFeed.load()
+    # rebuilds the row on the next home page request
+    apps.get_model('core', 'HomeFeed').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_metric_buckets'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_home_feed, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django_ckeditor_5.fields import CKEditor5Field
 
 class Tag(models.Model):
@@ -24,3 +25,178 @@ class Category(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class HomeFeed(models.Model):
+    """
+    Precomputed homepage article feed, stored as a single row so the home
+    page reads it in one query. Rebuilt by core.signals whenever an
+    article's published state or card content changes. View counts change
+    without a rebuild, so they are read live for the cards that show them.
+    """
+    FEATURED_LIMIT = 3
+    RECENT_LIMIT = 6
+
+    featured_articles = models.JSONField(default=list)
+    recent_articles = models.JSONField(default=list)
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Home feed ({self.built_at:%Y-%m-%d %H:%M})'
+
+    @staticmethod
+    def _card(article):
+        return {
+            'id': article.pk,
+            'title': article.title,
+            'url': article.get_absolute_url(),
+            'image_url': article.featured_image.url if article.featured_image else '',
+            'image': article.featured_image_renditions if article.featured_image else {},
+            'category': article.category.name if article.category else '',
+            'excerpt': article.excerpt or '',
+            'created_at': article.created_at.isoformat(),
+        }
+
+    @classmethod
+    def rebuild(cls):
+        from articles.models import Article
+
+        published = Article.objects.filter(status='PUBLISHED').select_related('category').defer('content')
+        featured = published.filter(is_featured=True).order_by('featured_rank', '-created_at')[:cls.FEATURED_LIMIT]
+        recent = published.order_by('-created_at')[:cls.RECENT_LIMIT]
+
+        feed, _ = cls.objects.update_or_create(pk=1, defaults={
+            'featured_articles': [cls._card(article) for article in featured],
+            'recent_articles': [cls._card(article) for article in recent],
+        })
+        return feed
+
+    @classmethod
+    def load(cls):
+        return cls.objects.filter(pk=1).first() or cls.rebuild()
+
+    @staticmethod
+    def _with_dates(cards):
+        from django.utils.dateparse import parse_datetime
+        return [dict(card, created_at=parse_datetime(card['created_at'])) for card in cards]
+
+    @staticmethod
+    def _with_views(cards):
+        from articles.models import Article
+        views = dict(Article.objects.filter(pk__in=[card['id'] for card in cards]).values_list('pk', 'views'))
+        return [dict(card, views=views.get(card['id'], 0)) for card in cards]
+
+    def featured_cards(self):
+        return self._with_views(self._with_dates(self.featured_articles))
+
+    def recent_cards(self):
+        return self._with_dates(self.recent_articles)
+
+
+class Job(models.Model):
+    """
+    A queued call to a function registered with ``core.jobs.task``. Rows
+    only live while the job is pending or running; the outcome is moved
+    to JobResult so the queue table stays small.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    STATUS_CHOICES = (
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+    )
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    # Lower runs first
+    priority = models.PositiveSmallIntegerField(default=100)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['priority', 'run_after', 'id']
+        indexes = [
+            # The worker's "next ready job" scan
+            models.Index(
+                fields=['priority', 'run_after', 'id'],
+                condition=models.Q(status='queued'),
+                name='job_ready_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
+
+
+class JobResult(models.Model):
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    job_id = models.PositiveBigIntegerField(db_index=True)
+    name = models.CharField(max_length=200)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=1)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    enqueued_at = models.DateTimeField()
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ['-finished_at']
+
+    def __str__(self):
+        return f'{self.name} #{self.job_id} ({self.status})'
+
+    @property
+    def duration_ms(self):
+        return round((self.finished_at - self.started_at).total_seconds() * 1000)
+
+
+class MetricBucket(models.Model):
+    """
+    One time bucket of an analytics counter (see core.analytics): the
+    number of ``metric`` events for one object, or for the whole site
+    when ``object_id`` is 0, that fell in the hour or day starting at
+    ``start``. Written as hourly buckets; old ones are compacted into
+    daily buckets.
+    """
+    HOUR = 'hour'
+    DAY = 'day'
+    RESOLUTION_CHOICES = (
+        (HOUR, 'Hour'),
+        (DAY, 'Day'),
+    )
+
+    metric = models.CharField(max_length=40)
+    object_id = models.PositiveBigIntegerField()
+    resolution = models.CharField(max_length=4, choices=RESOLUTION_CHOICES)
+    start = models.DateTimeField()
+    count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also the index for range reads of one series, at either resolution
+            models.UniqueConstraint(fields=['metric', 'object_id', 'start', 'resolution'], name='metric_bucket_unique'),
+        ]
+        indexes = [
+            # Compaction walks the hourly buckets oldest first
+            models.Index(fields=['start'], condition=models.Q(resolution='hour'), name='metric_bucket_hourly_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.metric} #{self.object_id} {self.resolution} {self.start:%Y-%m-%d %H:%M}: {self.count}'
@@ -0,0 +1,213 @@
+import functools
+import math
+import random
+import time
+import uuid
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+
+
+# =========================================================
+# RATE LIMITING
+# =========================================================
+# Token buckets kept in the shared cache, so limits hold across workers.
+# Each scope is configured in settings.RATELIMITS:
+#
+#   'chat': {'per_ip': '20/m', 'per_user': '10/m', 'max_in_flight': 16}
+#
+# - per_ip:        one bucket per client address (every request)
+# - per_user:      one bucket per logged-in user
+# - max_in_flight: requests allowed to run at once across all workers;
+#                  streamed responses hold their slot until fully sent.
+#                  Each of the N slots is its own cache key, taken with
+#                  add() and deleted on release, so a slot leaked by a
+#                  crashed worker simply expires after IN_FLIGHT_TTL
+#
+# A rate of "10/m" is a bucket of 10 tokens refilled at 10 per minute, so
+# short bursts are fine but the sustained rate is capped. Buckets are
+# read-modify-write without a lock: two requests racing on the same key
+# can both get the last token, which only matters at the margin.
+#
+#   @rate_limit('chat')
+#   def my_view(request): ...
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# How long a crashed worker's in-flight slot can stay taken
+IN_FLIGHT_TTL = 120
+
+
+def parse_rate(rate):
+    """'10/m' -> (capacity 10, refill of 10/60 tokens per second)"""
+    count, _, period = rate.partition('/')
+    seconds = PERIODS[period.strip()[:1]]
+    count = int(count)
+    return count, count / seconds
+
+
+def client_ip(request):
+    """
+    The caller's address. Behind RATELIMIT_PROXY_COUNT trusted proxies the
+    address comes from X-Forwarded-For, counted from the right so a client
+    can't pick its own by sending the header.
+    """
+    proxies = settings.RATELIMIT_PROXY_COUNT
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if proxies and forwarded:
+        hops = [hop.strip() for hop in forwarded.split(',') if hop.strip()]
+        if hops:
+            return hops[-min(proxies, len(hops))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _take_token(key, rate):
+    """Spend one token from the bucket at ``key``; seconds to wait if it is empty."""
+    capacity, refill = parse_rate(rate)
+    now = time.time()
+    tokens, stamp = cache.get(key) or (capacity, now)
+    tokens = min(capacity, tokens + (now - stamp) * refill)
+    if tokens < 1:
+        return (1 - tokens) / refill
+    # Kept until it would have refilled anyway
+    cache.set(key, (tokens - 1, now), timeout=math.ceil(capacity / refill) + 1)
+    return 0
+
+
+def _acquire_slot(scope, limit):
+    """Take a free in-flight slot; returns ``(key, token)`` to release it with, or None if all are taken."""
+    token = uuid.uuid4().hex
+    # Start at a random slot so concurrent requests rarely try the same keys
+    first = random.randrange(limit)
+    for index in range(limit):
+        key = f'ratelimit:{scope}:in-flight:{(first + index) % limit}'
+        if cache.add(key, token, timeout=IN_FLIGHT_TTL):
+            return key, token
+    return None
+
+
+def _release_slot(slot):
+    key, token = slot
+    # Only our own claim: after IN_FLIGHT_TTL the slot may belong to someone else
+    if cache.get(key) == token:
+        cache.delete(key)
+
+
+def _wants_json(request):
+    return (
+        request.content_type == 'application/json'
+        or 'application/json' in request.headers.get('Accept', '')
+        or request.path.startswith('/api/')
+    )
+
+
+def too_many_requests(request, retry_after):
+    retry_after = max(1, math.ceil(retry_after))
+    message = f'Too many requests. Please try again in {retry_after} seconds.'
+    if _wants_json(request):
+        response = JsonResponse({'error': message, 'retry_after': retry_after}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def check_rate_limit(request, scope):
+    """
+    Charge ``request`` against ``scope``. Returns ``(response, slot)``:
+    a 429 response if the request must be refused, and the in-flight
+    slot taken (if any) that the caller has to release.
+    """
+    config = settings.RATELIMITS.get(scope, {})
+    if not settings.RATELIMIT_ENABLED or not config:
+        return None, None
+
+    buckets = []
+    if 'per_ip' in config:
+        buckets.append((f'ratelimit:{scope}:ip:{client_ip(request)}', config['per_ip']))
+    user = getattr(request, 'user', None)
+    if 'per_user' in config and user is not None and user.is_authenticated:
+        buckets.append((f'ratelimit:{scope}:user:{user.pk}', config['per_user']))
+
+    for key, rate in buckets:
+        wait = _take_token(key, rate)
+        if wait:
+            return too_many_requests(request, wait), None
+
+    limit = config.get('max_in_flight')
+    if limit:
+        slot = _acquire_slot(scope, limit)
+        if slot is None:
+            return too_many_requests(request, 1), None
+        return None, slot
+    return None, None
+
+
+def _release_when_sent(response, slot):
+    """Free the in-flight slot now, or once a streamed body has been sent."""
+    if not response.streaming:
+        _release_slot(slot)
+        return response
+
+    content = response.streaming_content
+    if response.is_async:
+        async def released():
+            try:
+                async for chunk in content:
+                    yield chunk
+            finally:
+                await sync_to_async(_release_slot)(slot)
+    else:
+        def released():
+            try:
+                yield from content
+            finally:
+                _release_slot(slot)
+    response.streaming_content = released()
+    return response
+
+
+def rate_limit(scope, methods=('POST',)):
+    """
+    Apply the ``scope`` limits from settings.RATELIMITS to a view, for
+    requests whose method is in ``methods``. Works on sync and async views.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            async def wrapper(request, *args, **kwargs):
+                if request.method not in methods:
+                    return await view(request, *args, **kwargs)
+                refused, slot = await sync_to_async(check_rate_limit)(request, scope)
+                if refused:
+                    return refused
+                if slot is None:
+                    return await view(request, *args, **kwargs)
+                try:
+                    response = await view(request, *args, **kwargs)
+                except BaseException:
+                    await sync_to_async(_release_slot)(slot)
+                    raise
+                if not response.streaming:
+                    await sync_to_async(_release_slot)(slot)
+                    return response
+                return _release_when_sent(response, slot)
+        else:
+            def wrapper(request, *args, **kwargs):
+                if request.method not in methods:
+                    return view(request, *args, **kwargs)
+                refused, slot = check_rate_limit(request, scope)
+                if refused:
+                    return refused
+                if slot is None:
+                    return view(request, *args, **kwargs)
+                try:
+                    response = view(request, *args, **kwargs)
+                except BaseException:
+                    _release_slot(slot)
+                    raise
+                return _release_when_sent(response, slot)
+
+        return functools.wraps(view)(wrapper)
+    return decorator
@@ -0,0 +1,440 @@
+import io
+import json
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, time as dt_time, timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.text import slugify
+
+from articles.models import Article, AuthorStats, Category, Comment
+from campaigns.models import Campaign, CampaignSuggestion
+from .cache import invalidate_namespace
+from .models import HomeFeed
+
+
+# =========================================================
+# SYNTHETIC DATA
+# =========================================================
+# Fills the database with a deterministic, production-shaped dataset for
+# benchmarks and scale testing (``manage.py seed_scale``, ``manage.py
+# benchmark --scale``). The same seed and anchor date always produce the
+# same rows, whichever write method is used:
+#
+# - orm:         bulk_create in batches
+# - executemany: one prepared INSERT per batch, no model instances
+# - copy:        PostgreSQL COPY FROM STDIN (the default there)
+#
+# Model signals don't fire; the denormalized counters they would maintain
+# (comment_count, participant_count, AuthorStats) and the home feed are
+# rebuilt in a few set-based queries at the end. The full-text index is
+# left alone: run ``manage.py rebuild_search_index`` if search matters.
+#
+# Generated users are named "seed-user-<n>", are never staff and have
+# unusable passwords: the dataset is for measuring, not for logging in.
+# seed_scale and benchmark (which seeds with --scale and joins campaigns
+# and chats as its own users) refuse to run with DEBUG off unless forced,
+# see require_scratch_database().
+
+SCALES = {
+    'ci': {
+        'users': 150, 'categories': 6, 'articles': 60, 'comments': 400,
+        'campaigns': 15, 'participations': 600, 'suggestions': 20,
+    },
+    'small': {
+        'users': 2_000, 'categories': 10, 'articles': 5_000, 'comments': 50_000,
+        'campaigns': 100, 'participations': 25_000, 'suggestions': 200,
+    },
+    'full': {
+        'users': 50_000, 'categories': 12, 'articles': 100_000, 'comments': 1_000_000,
+        'campaigns': 500, 'participations': 500_000, 'suggestions': 2_000,
+    },
+}
+
+METHODS = ('orm', 'executemany', 'copy')
+
+
+CATEGORY_NAMES = (
+    'Climate Action', 'Waste Reduction', 'Marine Life', 'Forests', 'Urban Gardening', 'Clean Energy',
+    'Water Conservation', 'Wildlife', 'Air Quality', 'Sustainable Living', 'Disaster Resilience', 'Eco Tourism',
+)
+
+WORDS = (
+    'mangrove', 'coral', 'reef', 'plastic', 'recycling', 'compost', 'solar', 'typhoon', 'watershed', 'forest',
+    'barangay', 'community', 'cleanup', 'river', 'coastline', 'biodiversity', 'emissions', 'tree', 'planting',
+    'volunteers', 'school', 'garden', 'rainwater', 'energy', 'bamboo', 'upcycling', 'landfill', 'farmers',
+    'fisherfolk', 'seagrass', 'turtle', 'eagle', 'wetland', 'flood', 'drought', 'heat', 'transport', 'bicycle',
+    'market', 'packaging', 'refill', 'station', 'zero', 'waste', 'local', 'youth', 'campaign', 'policy', 'city',
+    'province', 'island', 'mountain', 'park', 'habitat', 'species', 'climate', 'resilience', 'harvest', 'seedlings',
+)
+
+LINK_HOSTS = ('denr.gov.ph', 'emb.gov.ph', 'pagasa.dost.gov.ph', 'wwf.org.ph', 'unep.org')
+
+ARTICLE_STATUSES = (('PUBLISHED', 85), ('DRAFT', 10), ('ARCHIVED', 5))
+
+
+@contextmanager
+def manual_timestamps(*models):
+    """Let bulk_create keep the created_at/updated_at values we generate."""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def copy_text(value):
+    """One value in PostgreSQL's COPY text format."""
+    if value is None:
+        return r'\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def require_scratch_database(force=False):
+    """Refuse to write throwaway data with DEBUG off, unless ``force`` says the database isn't production."""
+    if not settings.DEBUG and not force:
+        raise CommandError('DEBUG is off; this looks like a production database. Pass --force if it is not.')
+
+
+class Seeder:
+    BATCH_SIZE = 5000
+    # Articles and comments are spread over this many days before the anchor
+    HISTORY_DAYS = 730
+
+    def __init__(self, counts, seed=0, anchor=None, method=None, batch_size=None, log=None):
+        self.counts = counts
+        self.seed = seed
+        self.rng = random.Random(seed)
+        if anchor is None:
+            anchor = timezone.localtime().date()
+        self.anchor = timezone.make_aware(datetime.combine(anchor, dt_time.min))
+        if method is None:
+            method = 'copy' if connection.vendor == 'postgresql' else 'executemany'
+        if method not in METHODS:
+            raise ValueError(f'Unknown write method {method!r}')
+        if method == 'copy' and connection.vendor != 'postgresql':
+            raise ValueError('COPY needs PostgreSQL')
+        self.method = method
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.log = log or (lambda message: None)
+        self.user_ids = []
+        self.category_ids = []
+        self.article_ids = []
+        self.campaign_ids = []
+
+    # ---------------------------------------------------------
+    # Text and values
+    # ---------------------------------------------------------
+    def words(self, count):
+        return ' '.join(self.rng.choices(WORDS, k=count))
+
+    def sentence(self, low=8, high=18):
+        text = self.words(self.rng.randint(low, high))
+        return text[0].upper() + text[1:] + '.'
+
+    def paragraph(self, sentences):
+        return ' '.join(self.sentence() for _ in range(sentences))
+
+    def html_body(self, blocks):
+        """Markup shaped like CKEditor output: paragraphs with inline formatting, headings, lists, quotes."""
+        parts = []
+        for _ in range(blocks):
+            kind = self.rng.random()
+            if kind < 0.12:
+                parts.append(f'<h2>{self.sentence(3, 7).rstrip(".")}</h2>')
+            elif kind < 0.22:
+                items = ''.join(f'<li>{self.sentence(4, 10)}</li>' for _ in range(self.rng.randint(3, 6)))
+                tag = self.rng.choice(('ul', 'ol'))
+                parts.append(f'<{tag}>{items}</{tag}>')
+            elif kind < 0.27:
+                parts.append(f'<blockquote><p>{self.sentence(10, 20)}</p></blockquote>')
+            else:
+                sentences = [self.sentence() for _ in range(self.rng.randint(3, 6))]
+                emphasis = self.rng.randrange(len(sentences))
+                sentences[emphasis] = f'<strong>{sentences[emphasis]}</strong>'
+                if self.rng.random() < 0.3:
+                    host = self.rng.choice(LINK_HOSTS)
+                    sentences.append(f'<a href="https://{host}/{self.rng.choice(WORDS)}">{self.words(3)}</a>.')
+                parts.append(f'<p>{" ".join(sentences)}</p>')
+        return ''.join(parts)
+
+    def moment(self, days_back):
+        return self.anchor - timedelta(seconds=self.rng.randrange(days_back * 86400))
+
+    def skewed(self, ids):
+        """Pick from ``ids`` with most picks near the front, like real traffic."""
+        return ids[int(len(ids) * self.rng.random() ** 3)]
+
+    # ---------------------------------------------------------
+    # Writers
+    # ---------------------------------------------------------
+    def write(self, model, rows, label, returning=None):
+        """
+        Insert ``rows`` (dicts of field attname -> value). With ``returning``
+        set, returns the new primary keys in insert order; as tuples of
+        ``(pk, *returning)`` if it names columns.
+        """
+        fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+        last_pk = model.objects.aggregate(last=Max('pk'))['last'] or 0
+        created = []
+        total = 0
+        started = time.monotonic()
+        with transaction.atomic(), connection.cursor() as cursor:
+            for batch in batched(rows, self.batch_size):
+                if self.method == 'orm':
+                    created.extend(self._bulk_create(model, batch))
+                elif self.method == 'executemany':
+                    self._executemany(cursor, model, fields, batch)
+                else:
+                    self._copy(cursor, model, fields, batch)
+                total += len(batch)
+        self.log(f'{label}: {total} rows in {time.monotonic() - started:.1f}s')
+
+        if returning is None:
+            return None
+        if self.method == 'orm':
+            return [obj.pk if not returning else (obj.pk, *(getattr(obj, name) for name in returning)) for obj in created]
+        # Nothing else writes while we seed, so the new rows are the ones above the old maximum
+        new_rows = model.objects.filter(pk__gt=last_pk).order_by('pk')
+        if not returning:
+            return list(new_rows.values_list('pk', flat=True))
+        return list(new_rows.values_list('pk', *returning))
+
+    def _bulk_create(self, model, batch):
+        with manual_timestamps(model):
+            return model.objects.bulk_create([model(**row) for row in batch], batch_size=self.batch_size)
+
+    def _values(self, fields, row):
+        return [row[field.attname] if field.attname in row else field.get_default() for field in fields]
+
+    def _executemany(self, cursor, model, fields, batch):
+        quote = connection.ops.quote_name
+        columns = ', '.join(quote(field.column) for field in fields)
+        placeholders = ', '.join(['%s'] * len(fields))
+        cursor.executemany(
+            f'INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES ({placeholders})',
+            [
+                [field.get_db_prep_save(value, connection) for field, value in zip(fields, self._values(fields, row))]
+                for row in batch
+            ],
+        )
+
+    def _copy(self, cursor, model, fields, batch):
+        quote = connection.ops.quote_name
+        columns = ', '.join(quote(field.column) for field in fields)
+        sql = f'COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN'
+        data = ''.join('\t'.join(copy_text(value) for value in self._values(fields, row)) + '\n' for row in batch)
+        raw = cursor.cursor
+        if hasattr(raw, 'copy'):
+            # psycopg 3
+            with raw.copy(sql) as copy:
+                copy.write(data)
+        else:
+            raw.copy_expert(sql, io.StringIO(data))
+
+    # ---------------------------------------------------------
+    # Tables
+    # ---------------------------------------------------------
+    def users(self):
+        User = get_user_model()
+        password = make_password(None)
+        start = User.objects.filter(username__startswith='seed-user-').count()
+
+        def rows():
+            for number in range(start, start + self.counts['users']):
+                yield {
+                    'username': f'seed-user-{number:07d}',
+                    'email': f'seed-user-{number}@example.com',
+                    'first_name': self.rng.choice(WORDS).title(),
+                    'last_name': self.rng.choice(WORDS).title(),
+                    'password': password,
+                    'date_joined': self.moment(self.HISTORY_DAYS),
+                }
+        self.user_ids = self.write(User, rows(), 'users', returning=())
+
+    def categories(self):
+        existing = set(Category.objects.values_list('name', flat=True))
+        names = [name for name in CATEGORY_NAMES[:self.counts['categories']] if name not in existing]
+        rows = (
+            {'name': name, 'slug': slugify(name), 'description': self.sentence(), 'created_at': self.moment(self.HISTORY_DAYS)}
+            for name in names
+        )
+        self.write(Category, rows, 'categories')
+        self.category_ids = list(Category.objects.values_list('pk', flat=True))
+
+    def articles(self):
+        statuses, weights = zip(*ARTICLE_STATUSES)
+        # A minority of users write nearly everything
+        authors = self.user_ids[:max(1, len(self.user_ids) // 10)]
+        start = Article.objects.count()
+
+        def rows():
+            for number in range(start, start + self.counts['articles']):
+                title = self.sentence(4, 9).rstrip('.')
+                created = self.moment(self.HISTORY_DAYS)
+                yield {
+                    'title': title,
+                    'slug': f'{slugify(title)[:180]}-{number}',
+                    'content': self.html_body(self.rng.randint(5, 12)),
+                    'excerpt': self.sentence(15, 30),
+                    'category_id': self.rng.choice(self.category_ids) if self.category_ids else None,
+                    'author_id': self.skewed(authors),
+                    'status': self.rng.choices(statuses, weights)[0],
+                    'views': int(self.rng.paretovariate(1.2) * 20),
+                    'is_featured': self.rng.random() < 0.01,
+                    'featured_rank': self.rng.randint(0, 10),
+                    'created_at': created,
+                    'updated_at': created,
+                }
+        self.article_ids = self.write(Article, rows(), 'articles', returning=())
+
+    def comments(self):
+        total = self.counts['comments']
+        top_level = []
+
+        def rows(count, replies):
+            for _ in range(count):
+                created = self.moment(self.HISTORY_DAYS)
+                if replies:
+                    parent_id, article_id = self.rng.choice(top_level)
+                else:
+                    parent_id, article_id = None, self.skewed(self.article_ids)
+                yield {
+                    'article_id': article_id,
+                    'parent_id': parent_id,
+                    'author_id': self.rng.choice(self.user_ids),
+                    'content': self.paragraph(self.rng.randint(1, 3)),
+                    'is_active': self.rng.random() > 0.02,
+                    'created_at': created,
+                    'updated_at': created,
+                }
+
+        replies = total // 5
+        top_level = self.write(Comment, rows(total - replies, False), 'comments', returning=('article_id',))
+        if top_level:
+            self.write(Comment, rows(replies, True), 'replies')
+
+    def campaigns(self):
+        def rows():
+            for _ in range(self.counts['campaigns']):
+                start = self.moment(365) + timedelta(days=120)
+                created = start - timedelta(days=self.rng.randint(7, 60))
+                yield {
+                    'title': self.sentence(3, 6).rstrip('.').title(),
+                    'description': self.html_body(self.rng.randint(2, 5)),
+                    'start_date': start,
+                    'end_date': start + timedelta(days=self.rng.randint(1, 90)),
+                    'is_active': self.rng.random() > 0.1,
+                    'goals': [self.sentence(4, 8) for _ in range(self.rng.randint(1, 4))],
+                    'created_at': created,
+                    'updated_at': created,
+                }
+        self.campaign_ids = self.write(Campaign, rows(), 'campaigns', returning=())
+
+    def participation_sizes(self):
+        """Sign-ups per campaign: popular campaigns draw most, none beyond the user count."""
+        cap = len(self.user_ids)
+        total = min(self.counts['participations'], len(self.campaign_ids) * cap)
+        weights = [1 / (rank + 1) for rank in range(len(self.campaign_ids))]
+        sizes = [min(cap, int(total * weight / sum(weights))) for weight in weights]
+        # Whatever the cap cut off goes to the next most popular campaigns
+        shortfall = total - sum(sizes)
+        for index, size in enumerate(sizes):
+            extra = min(cap - size, shortfall)
+            sizes[index] += extra
+            shortfall -= extra
+        return sizes
+
+    def participations(self):
+        def rows():
+            for campaign_id, size in zip(self.campaign_ids, self.participation_sizes()):
+                for user_id in self.rng.sample(self.user_ids, size):
+                    yield {'campaign_id': campaign_id, 'user_id': user_id}
+
+        self.write(Campaign.participants.through, rows(), 'participations')
+
+    def suggestions(self):
+        statuses = [status for status, _ in CampaignSuggestion.STATUS_CHOICES]
+
+        def rows():
+            for _ in range(self.counts['suggestions']):
+                yield {
+                    'user_id': self.rng.choice(self.user_ids),
+                    'title': self.sentence(3, 6).rstrip('.'),
+                    'description': self.paragraph(2),
+                    'reason': self.paragraph(1),
+                    'status': self.rng.choice(statuses),
+                    'created_at': self.moment(365),
+                }
+        self.write(CampaignSuggestion, rows(), 'suggestions')
+
+    # ---------------------------------------------------------
+    # Derived data
+    # ---------------------------------------------------------
+    def refresh_counters(self):
+        """Recompute what the model signals would have kept up to date."""
+        active_comments = (
+            Comment.objects.filter(article=OuterRef('pk'), is_active=True)
+            .order_by().values('article').annotate(total=Count('pk')).values('total')
+        )
+        Article.objects.update(comment_count=Coalesce(Subquery(active_comments), Value(0)))
+
+        participants = (
+            Campaign.participants.through.objects.filter(campaign=OuterRef('pk'))
+            .order_by().values('campaign').annotate(total=Count('pk')).values('total')
+        )
+        Campaign.objects.update(participant_count=Coalesce(Subquery(participants), Value(0)))
+
+        AuthorStats.objects.all().delete()
+        totals = Article.objects.order_by().values('author').annotate(articles=Count('pk'), views=Sum('views'))
+        AuthorStats.objects.bulk_create(
+            [AuthorStats(author_id=row['author'], article_count=row['articles'], total_views=row['views'] or 0)
+             for row in totals.iterator()],
+            batch_size=self.BATCH_SIZE,
+        )
+
+        HomeFeed.rebuild()
+        for namespace in ('articles', 'campaigns', 'categories', 'home'):
+            invalidate_namespace(namespace)
+        self.log('counters refreshed')
+
+    def run(self):
+        self.users()
+        self.categories()
+        self.articles()
+        self.comments()
+        self.campaigns()
+        self.participations()
+        self.suggestions()
+        self.refresh_counters()
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
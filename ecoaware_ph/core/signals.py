@@ -0,0 +1,123 @@
+import sys
+
+from django.core.signals import got_request_exception, request_finished
+from django.db import InterfaceError, OperationalError, transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from articles.models import Article, Category
+from campaigns.models import Campaign, CampaignSuggestion
+from . import dbpool, images, instrumentation
+from .cache import invalidate_namespace
+from .models import HomeFeed
+
+
+# =========================================================
+# CACHE INVALIDATION
+# =========================================================
+# Each model bumps the namespaces whose cached output it appears in.
+# Home page fragments track these namespaces as dependencies (see
+# core.cache.cached_fragment), so they go stale precisely when their
+# own data changes without the 'home' namespace being wiped.
+#
+# Articles also feed the denormalized HomeFeed, rebuilt once the change
+# commits; the 'articles' bump waits for the rebuild, so a fragment
+# rebuilt in between can't be cached under the new version from the old
+# feed.
+
+
+def rebuild_home_feed():
+    HomeFeed.rebuild()
+    invalidate_namespace('articles')
+
+
+@receiver([post_save, post_delete], sender=Article)
+def invalidate_article_caches(sender, update_fields=None, **kwargs):
+    # Buffered view-count writes don't change anything we cache
+    if update_fields and set(update_fields) <= {'views'}:
+        return
+    transaction.on_commit(rebuild_home_feed)
+
+
+@receiver([post_save, post_delete], sender=Campaign)
+def invalidate_campaign_caches(sender, **kwargs):
+    invalidate_namespace('campaigns')
+
+
+@receiver(m2m_changed, sender=Campaign.participants.through)
+def invalidate_participant_caches(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_namespace('campaigns')
+
+
+@receiver([post_save, post_delete], sender=CampaignSuggestion)
+def invalidate_dashboard_caches(sender, **kwargs):
+    # Suggestions are approved from the admin dashboard; show the outcome right away
+    invalidate_namespace('dashboard')
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_caches(sender, **kwargs):
+    invalidate_namespace('categories')
+    transaction.on_commit(rebuild_home_feed)
+
+
+# =========================================================
+# IMAGE DERIVATIVES
+# =========================================================
+# A new or cleared upload queues a core.images job in the same
+# transaction, so it only runs if the save commits. The job's own save
+# (update_fields=<field>_renditions) and saves that leave the upload
+# alone are ignored.
+
+IMAGE_FIELDS = {Article: 'featured_image', Campaign: 'image'}
+
+
+def queue_renditions(sender, instance, update_fields=None, **kwargs):
+    field_name = IMAGE_FIELDS[sender]
+    renditions = getattr(instance, f'{field_name}_renditions') or {}
+    if update_fields is not None and f'{field_name}_renditions' in update_fields:
+        return
+    if (getattr(instance, field_name).name or '') == (renditions.get('source') or ''):
+        return
+    images.schedule_renditions(instance, field_name)
+
+
+def queue_rendition_cleanup(sender, instance, **kwargs):
+    images.schedule_cleanup(instance, IMAGE_FIELDS[sender])
+
+
+for model in IMAGE_FIELDS:
+    post_save.connect(queue_renditions, sender=model, dispatch_uid=f'queue_renditions_{model.__name__}')
+    post_delete.connect(queue_rendition_cleanup, sender=model, dispatch_uid=f'rendition_cleanup_{model.__name__}')
+
+
+# =========================================================
+# DATABASE CONNECTION METRICS
+# =========================================================
+# Outside pool mode every connection_created is a new server connection.
+# With the psycopg pool it fires on each checkout instead, and the pool
+# keeps its own counters, collected once a request is done.
+
+@receiver(connection_created, dispatch_uid='count_db_connections')
+def count_db_connections(sender, connection, **kwargs):
+    if connection.alias == 'default' and not connection.settings_dict['OPTIONS'].get('pool'):
+        dbpool.stats.record(connections_opened=1)
+
+
+# Query counts and SQL time for the request instrumentation (core.instrumentation)
+@receiver(connection_created, dispatch_uid='instrument_db_queries')
+def instrument_db_queries(sender, connection, **kwargs):
+    instrumentation.install_query_recorder(connection)
+
+
+@receiver(got_request_exception, dispatch_uid='count_db_request_errors')
+def count_db_request_errors(sender, request=None, **kwargs):
+    if isinstance(sys.exc_info()[1], (OperationalError, InterfaceError)):
+        dbpool.stats.record(query_errors=1)
+
+
+@receiver(request_finished, dispatch_uid='push_db_pool_stats')
+def push_db_pool_stats(sender, **kwargs):
+    dbpool.stats.maybe_push()
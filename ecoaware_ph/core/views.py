@@ -1,94 +1,189 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
+import hmac
 import json
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+
+from . import ecobot, llm
+from .ratelimit import rate_limit
+
+logger = logging.getLogger(__name__)
+
 
 def home(request):
     """Homepage view"""
-    try:
-        from articles.models import Article
-        from campaigns.models import Campaign
-        
-        featured_articles = Article.objects.filter(status='published', is_featured=True)[:3]
-        featured_campaigns = Campaign.objects.filter(is_active=True)[:3]
-        recent_articles = Article.objects.filter(status='published')[:6]
-        
-        context = {
-            'featured_articles': featured_articles,
-            'featured_campaigns': featured_campaigns,
-            'recent_articles': recent_articles,
-        }
-    except:
-        context = {
-            'featured_articles': [],
-            'featured_campaigns': [],
-            'recent_articles': [],
-        }
-    
-    return render(request, 'home.html', context)
+    from django.template.loader import render_to_string
+    from django.utils.safestring import mark_safe
+    from campaigns.models import Campaign
+    from .cache import cached_fragment
+    from .models import HomeFeed
+
+    def featured_campaigns():
+        return {'featured_campaigns': Campaign.objects.filter(is_active=True)[:3]}
+
+    # Article blocks read the precomputed feed row (one query for both)
+    feed = []
+
+    def load_feed():
+        if not feed:
+            feed.append(HomeFeed.load())
+        return feed[0]
+
+    def featured_articles():
+        return {'featured_articles': load_feed().featured_cards()}
+
+    def recent_articles():
+        return {'recent_articles': load_feed().recent_cards()}
+
+    # Each block is cached as rendered HTML and only depends on its own models
+    blocks = (
+        ('featured_campaigns', featured_campaigns, ('campaigns',)),
+        ('featured_articles', featured_articles, ('articles', 'categories')),
+        ('recent_articles', recent_articles, ('articles', 'categories')),
+    )
+
+    fragments = {}
+    for name, context, depends_on in blocks:
+        def build(name=name, context=context):
+            return render_to_string(f'includes/home_{name}.html', context())
+
+        fragments[name] = mark_safe(cached_fragment(name, build, depends_on=depends_on))
+
+    return render(request, 'home.html', {'fragments': fragments})
 
 @login_required
 def dashboard(request):
     """User dashboard view."""
     return render(request, 'core/dashboard.html')
 
+CHAT_UNAVAILABLE = "Sorry, I'm having trouble connecting right now."
+CHAT_TIMED_OUT = "EcoBot is taking too long to answer. Please try again in a moment. 🌱"
+
+
+def _sse(event, payload):
+    return f'event: {event}\ndata: {json.dumps(payload)}\n\n'
+
+
+async def _chat_events(message):
+    """Server-sent events: a ``token`` per fragment, then ``done`` or ``error``"""
+    started = time.monotonic()
+    parts = []
+    try:
+        async for text in llm.stream_reply(message):
+            parts.append(text)
+            yield _sse('token', {'text': text})
+    except TimeoutError:
+        yield _sse('error', {'reply': CHAT_TIMED_OUT})
+    except Exception:
+        logger.exception('EcoBot stream failed')
+        yield _sse('error', {'reply': CHAT_UNAVAILABLE})
+    else:
+        await sync_to_async(_remember_reply)(message, ''.join(parts), time.monotonic() - started)
+        yield _sse('done', {'source': 'model'})
+
+
+async def _local_events(answer, source):
+    yield _sse('token', {'text': answer})
+    yield _sse('done', {'source': source})
+
+
+def _remember_reply(message, reply, latency):
+    ecobot.chat_stats.record('model', latency)
+    ecobot.answers.set(message, reply, latency)
+
+
 @csrf_exempt
-def chatbot_api(request):
-    if request.method == 'POST':
-        try:
-            data = json.loads(request.body)
-            user_message = data.get('message', '')
-            
-            # 1. Get API Key from environment
-            import os
-            from groq import Groq
-            from dotenv import load_dotenv
-            
-            load_dotenv() # Load .env file
-            
-            api_key = os.getenv("GROQ_API_KEY")
-            
-            if not api_key:
-                return JsonResponse({
-                    'reply': "I'm ready for speed! ⚡ Just add the 'GROQ_API_KEY' to your .env file."
-                })
-
-            # 2. Configure Groq
-            client = Groq(api_key=api_key)
-            
-            # 3. Create prompt with persona
-            system_instruction = (
-                "You are EcoBot, the friendly AI assistant for EcoAware PH. "
-                "Your goal is to help users with environmental questions, recycling tips, and navigating the site. "
-                "Keep answers concise, encouraging, and emoji-friendly."
-            )
-            
-            # 4. Generate Response (Llama 3)
-            chat_completion = client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_instruction,
-                    },
-                    {
-                        "role": "user",
-                        "content": user_message,
-                    }
-                ],
-                model="llama-3.3-70b-versatile",
-            )
-            
-            bot_reply = chat_completion.choices[0].message.content
-            
-            return JsonResponse({'reply': bot_reply})
-            
-        except Exception as e:
-            print(f"Chat Error: {e}") # Log to terminal
-            # Keep debug error for now so user can report if this model fails too
-            return JsonResponse({'reply': f"Debug Error: {str(e)}"}, status=200)
-            
-    return JsonResponse({'error': 'Invalid request'}, status=405)  
+@rate_limit('chat')
+async def chatbot_api(request):
+    """
+    EcoBot chat. Clients sending ``Accept: text/event-stream`` get the reply
+    streamed as server-sent events; everyone else gets ``{"reply": ...}``.
+    FAQ matches and cached answers are served without calling the model.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request'}, status=405)
+
+    try:
+        data = json.loads(request.body)
+        user_message = str(data.get('message', '')).strip()
+    except (ValueError, AttributeError):
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    if not user_message:
+        return JsonResponse({'error': 'Message is required'}, status=400)
+
+    streaming = 'text/event-stream' in request.headers.get('Accept', '')
+
+    source, answer = await sync_to_async(ecobot.answer_locally)(user_message, request.user)
+    if source:
+        if streaming:
+            response = StreamingHttpResponse(_local_events(answer, source), content_type='text/event-stream')
+            response['Cache-Control'] = 'no-cache'
+            return response
+        return JsonResponse({'reply': answer, 'source': source})
+
+    if not settings.GROQ_API_KEY:
+        return JsonResponse({
+            'reply': "I'm ready for speed! ⚡ Just add the 'GROQ_API_KEY' to your .env file."
+        })
+
+    if streaming:
+        response = StreamingHttpResponse(_chat_events(user_message), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Stop proxies from buffering the stream into a single response
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    started = time.monotonic()
+    try:
+        reply = await llm.complete_reply(user_message)
+    except TimeoutError:
+        return JsonResponse({'reply': CHAT_TIMED_OUT}, status=504)
+    except Exception:
+        logger.exception('EcoBot request failed')
+        return JsonResponse({'reply': CHAT_UNAVAILABLE}, status=502)
+    await sync_to_async(_remember_reply)(user_message, reply, time.monotonic() - started)
+    return JsonResponse({'reply': reply, 'source': 'model'})
+
+@login_required
+def cache_stats(request):
+    """Shared cache hit/miss counters per namespace and EcoBot answer stats (staff only)"""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+
+    from .cache import stats
+
+    return JsonResponse({
+        'backend': settings.CACHES['default']['BACKEND'],
+        'namespaces': stats.snapshot(),
+        'chat': ecobot.chat_stats.snapshot(),
+    })
+
+@login_required
+def db_stats(request):
+    """Database connection pool counters and this worker's pool sizes (staff only)"""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+
+    from .dbpool import stats
+
+    return JsonResponse(stats.snapshot())
+
+def metrics(request):
+    """This worker's request metrics in Prometheus text format (staff or METRICS_TOKEN)"""
+    token = settings.METRICS_TOKEN
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+    if not (request.user.is_staff or (token and hmac.compare_digest(supplied, token))):
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+
+    from .instrumentation import registry
+
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 @login_required
 def about(request):
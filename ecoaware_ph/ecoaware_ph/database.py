@@ -0,0 +1,66 @@
+"""
+Builds ``DATABASES['default']`` for one of three connection modes:
+
+- ``pool``:       psycopg 3's native connection pool (PostgreSQL only).
+                  Connections are checked on checkout and recycled after
+                  ``max_lifetime``; required for long-lived connections
+                  under ASGI, where each request may run on a new thread.
+- ``persistent``: Django's per-thread persistent connections
+                  (CONN_MAX_AGE) with CONN_HEALTH_CHECKS, so a connection
+                  the server dropped while idle is replaced instead of
+                  failing the next request.
+- ``off``:        a new connection per request.
+
+``auto`` picks ``pool`` when the database is PostgreSQL and psycopg_pool
+is installed, ``persistent`` otherwise.
+"""
+import importlib.util
+
+import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
+
+MODES = ('auto', 'pool', 'persistent', 'off')
+
+
+def pool_available():
+    return importlib.util.find_spec('psycopg') is not None and importlib.util.find_spec('psycopg_pool') is not None
+
+
+def database_config(url, mode='auto', conn_max_age=600, min_size=2, max_size=8, timeout=10,
+                    max_idle=300, max_lifetime=1800, has_pool=None):
+    """Returns ``(resolved_mode, settings_dict)``."""
+    if mode not in MODES:
+        raise ImproperlyConfigured(f'DB_POOL_MODE must be one of {", ".join(MODES)}, not {mode!r}')
+
+    config = dj_database_url.parse(url)
+    is_postgres = config['ENGINE'] == 'django.db.backends.postgresql'
+    if has_pool is None:
+        has_pool = pool_available()
+
+    if mode == 'auto':
+        mode = 'pool' if is_postgres and has_pool else 'persistent'
+
+    if mode == 'pool':
+        if not is_postgres:
+            raise ImproperlyConfigured('DB_POOL_MODE=pool needs a PostgreSQL DATABASE_URL')
+        if not has_pool:
+            raise ImproperlyConfigured('DB_POOL_MODE=pool needs psycopg 3 with psycopg_pool installed')
+        from psycopg_pool import ConnectionPool
+
+        # Django hands connections back to the pool after every request
+        config['CONN_MAX_AGE'] = 0
+        config.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': min_size,
+            'max_size': max_size,
+            'timeout': timeout,
+            'max_idle': max_idle,
+            'max_lifetime': max_lifetime,
+            'check': ConnectionPool.check_connection,
+        }
+    elif mode == 'persistent':
+        config['CONN_MAX_AGE'] = conn_max_age
+        config['CONN_HEALTH_CHECKS'] = True
+    else:
+        config['CONN_MAX_AGE'] = 0
+
+    return mode, config
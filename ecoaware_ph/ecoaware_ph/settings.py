@@ -1,6 +1,8 @@
 from pathlib import Path
 import os
-import dj_database_url
+import importlib.util
+import tempfile
+from .database import database_config
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -46,6 +48,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.instrumentation.RequestMetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -58,7 +61,8 @@ ROOT_URLCONF = 'ecoaware_ph.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that reports render time to core.instrumentation
+        'BACKEND': 'core.instrumentation.InstrumentedTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -75,12 +79,74 @@ TEMPLATES = [
 WSGI_APPLICATION = 'ecoaware_ph.wsgi.application'
 
 
-DATABASES = {
-    'default': dj_database_url.config(
-        default='sqlite:///' + str(BASE_DIR / 'db.sqlite3'),
-        conn_max_age=600
-    )
-}
+# Database connections
+# DB_POOL_MODE is one of auto / pool / persistent / off (see
+# ecoaware_ph/database.py). Under the ASGI server each request can run on
+# a different thread, so per-thread persistent connections pile up;
+# PostgreSQL deployments should use the psycopg pool. Sizes are per
+# process: keep web workers * DB_POOL_MAX_SIZE (+ the job worker) below
+# the server's connection limit.
+DB_POOL_MODE, _default_database = database_config(
+    os.environ.get('DATABASE_URL', 'sqlite:///' + str(BASE_DIR / 'db.sqlite3')),
+    mode=os.environ.get('DB_POOL_MODE', 'auto'),
+    conn_max_age=int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+    min_size=int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+    max_size=int(os.environ.get('DB_POOL_MAX_SIZE', 8)),
+    timeout=float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+    max_idle=float(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+    max_lifetime=float(os.environ.get('DB_POOL_MAX_LIFETIME', 1800)),
+)
+DATABASES = {'default': _default_database}
+
+
+# Cache
+# A file-based cache is shared by every gunicorn worker on the instance
+# and needs no external service; set REDIS_URL to use Redis instead.
+# A job worker on another host (render.yaml) needs REDIS_URL too, or the
+# cache invalidations its jobs make never reach the web service.
+# The test runner (ecoaware_ph.test_runner) swaps in private in-memory caches.
+#
+# "state" holds core.cache's bookkeeping (namespace versions, counters):
+# a few entries that must never expire or be culled to make room.
+REDIS_URL = os.environ.get('REDIS_URL') if importlib.util.find_spec('redis') else None
+CACHE_DIR = os.environ.get('CACHE_DIR', os.path.join(tempfile.gettempdir(), 'ecoaware_ph_cache'))
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'ecoaware',
+        },
+        'state': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'ecoaware-state',
+            'TIMEOUT': None,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR,
+            'KEY_PREFIX': 'ecoaware',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        },
+        'state': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR + '-state',
+            'KEY_PREFIX': 'ecoaware',
+            'TIMEOUT': None,
+            # Never reached in practice, so nothing here is ever culled
+            'OPTIONS': {'MAX_ENTRIES': 1_000_000},
+        },
+    }
+
+TEST_RUNNER = 'ecoaware_ph.test_runner.TestRunner'
+
+# Seconds the admin dashboard's counters and lists are reused (see users.stats)
+ADMIN_DASHBOARD_TTL = int(os.environ.get('ADMIN_DASHBOARD_TTL', 30))
 
 
 AUTH_PASSWORD_VALIDATORS = []
@@ -151,13 +217,76 @@ CKEDITOR_5_CONFIGS = {
     },
 }
 
+# Article views are buffered in-process and written back in batches
+VIEW_COUNTER_FLUSH_INTERVAL = int(os.environ.get('VIEW_COUNTER_FLUSH_INTERVAL', 10))
+VIEW_COUNTER_MAX_PENDING = 1000
+
+# Uploaded images are resized to these widths by a background job (see core.images)
+IMAGE_RENDITION_WIDTHS = (320, 640, 960, 1280)
+
+# Background jobs (core.jobs), run by `manage.py runworker`. Eager mode
+# runs them in-process after commit instead of queueing them.
+JOB_QUEUE_EAGER = os.environ.get('JOB_QUEUE_EAGER', '') == '1'
+JOB_RETRY_BACKOFF = 10         # seconds before the first retry; doubles each time
+JOB_LOCK_TIMEOUT = 600         # a running job older than this is assumed dead and requeued
+JOB_RESULT_RETENTION_DAYS = 7
+
+# Hourly analytics buckets older than this many days are compacted into
+# daily ones by the worker (see core.analytics)
+ANALYTICS_HOURLY_RETENTION_DAYS = int(os.environ.get('ANALYTICS_HOURLY_RETENTION_DAYS', 2))
+
+# EcoBot chat (Groq). GROQ_BASE_URL points the client at a proxy or a fake
+# server; CHAT_TIMEOUT bounds a whole reply, streamed or not, in seconds.
+GROQ_API_KEY = os.environ.get('GROQ_API_KEY')
+GROQ_BASE_URL = os.environ.get('GROQ_BASE_URL') or None
+CHAT_MODEL = os.environ.get('CHAT_MODEL', 'llama-3.3-70b-versatile')
+CHAT_TIMEOUT = float(os.environ.get('CHAT_TIMEOUT', 20))
+# Model replies are reused for repeat questions (see core.ecobot)
+CHAT_CACHE_TTL = int(os.environ.get('CHAT_CACHE_TTL', 6 * 60 * 60))
+CHAT_CACHE_MAX_ENTRIES = 500
+
+# Token-bucket limits per view scope (see core.ratelimit). Rates are
+# "<requests>/<s|m|h|d>"; Render puts one proxy in front of the app.
+RATELIMIT_ENABLED = True
+RATELIMIT_PROXY_COUNT = 1 if 'RENDER' in os.environ else 0
+RATELIMITS = {
+    'chat': {'per_ip': '30/m', 'per_user': '15/m', 'max_in_flight': 16},
+    'join': {'per_user': '20/m'},
+    'comment': {'per_ip': '20/m', 'per_user': '6/m'},
+}
+
+# Request instrumentation (see core.instrumentation). METRICS_TOKEN lets a
+# Prometheus scraper read /ops/metrics/ with "Authorization: Bearer <token>".
+# The Server-Timing header shows anyone how much SQL a page runs, so it is
+# off outside DEBUG unless METRICS_SERVER_TIMING=1.
+METRICS_SERVER_TIMING = os.environ.get('METRICS_SERVER_TIMING', '1' if DEBUG else '0') == '1'
+METRICS_COLLECT = os.environ.get('METRICS_COLLECT', '1') == '1'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'bare': {
+            'format': '%(message)s',
+        },
+    },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
         },
+        # core.requests messages are already JSON
+        'structured': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'bare',
+        },
+    },
+    'loggers': {
+        'core.requests': {
+            'handlers': ['structured'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
     'root': {
         'handlers': ['console'],
@@ -0,0 +1,37 @@
+import logging
+
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+# =========================================================
+# TEST RUNNER
+# =========================================================
+# Tests get private in-memory caches whatever REDIS_URL or CACHE_DIR say,
+# so a run never reads or clears a shared cache, and the per-request JSON
+# lines of core.instrumentation are kept out of the test output.
+
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'state': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'state',
+        'TIMEOUT': None,
+    },
+}
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._test_settings = override_settings(CACHES=TEST_CACHES)
+        self._test_settings.enable()
+        self._request_log_level = logging.getLogger('core.requests').level
+        logging.getLogger('core.requests').setLevel(logging.WARNING)
+
+    def teardown_test_environment(self, **kwargs):
+        logging.getLogger('core.requests').setLevel(self._request_log_level)
+        self._test_settings.disable()
+        super().teardown_test_environment(**kwargs)
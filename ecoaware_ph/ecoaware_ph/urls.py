@@ -4,7 +4,7 @@ from django.views.generic import TemplateView
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib.auth.decorators import login_required
-from core.views import home
+from core.views import home, cache_stats, db_stats, metrics
 
 urlpatterns = [
 
@@ -23,6 +23,10 @@ urlpatterns = [
 
 
     path('api/chat/', include('core.urls')), 
+
+    path('ops/cache/', cache_stats, name='ops_cache_stats'),
+    path('ops/db/', db_stats, name='ops_db_stats'),
+    path('ops/metrics/', metrics, name='ops_metrics'),
 ]
 
 if settings.DEBUG:
@@ -26,8 +26,16 @@ content = """{% extends 'base.html' %}
                         <h1 class="text-3xl font-bold text-gray-800">Campaign Participants</h1>
                         <p class="text-gray-600 mt-2">{{ campaign.title }}</p>
                     </div>
-                    <div class="bg-emerald-100 text-emerald-800 px-4 py-2 rounded-full font-bold">
-                        {{ participants.count }} Joined
+                    <div class="flex items-center gap-3">
+                        {% if is_admin %}
+                        <a href="{% url 'campaigns:campaign_participants_export' campaign.pk %}"
+                            class="px-4 py-2 bg-white border border-gray-200 text-gray-700 rounded-full text-sm font-semibold hover:bg-gray-50">CSV</a>
+                        <a href="{% url 'campaigns:campaign_participants_export' campaign.pk %}?format=jsonl"
+                            class="px-4 py-2 bg-white border border-gray-200 text-gray-700 rounded-full text-sm font-semibold hover:bg-gray-50">JSONL</a>
+                        {% endif %}
+                        <div class="bg-emerald-100 text-emerald-800 px-4 py-2 rounded-full font-bold">
+                            {{ campaign.participant_count }} Joined
+                        </div>
                     </div>
                 </div>
 
@@ -47,6 +55,20 @@ content = """{% extends 'base.html' %}
                     </div>
                     {% endfor %}
                 </div>
+
+                {% if page_obj.has_other_pages %}
+                <div class="mt-8 flex justify-center items-center gap-2">
+                    {% if page_obj.has_previous %}
+                    <a href="?page={{ page_obj.previous_page_number }}"
+                        class="px-4 py-2 bg-white text-gray-700 rounded-lg hover:bg-gray-100 shadow-sm border border-gray-100">Previous</a>
+                    {% endif %}
+                    <span class="px-4 py-2 text-sm text-gray-600">Page {{ page_obj.number }} of {{ page_obj.paginator.num_pages }}</span>
+                    {% if page_obj.has_next %}
+                    <a href="?page={{ page_obj.next_page_number }}"
+                        class="px-4 py-2 bg-white text-gray-700 rounded-lg hover:bg-gray-100 shadow-sm border border-gray-100">Next</a>
+                    {% endif %}
+                </div>
+                {% endif %}
                 {% else %}
                 <div class="text-center py-12">
                     <span class="text-4xl mb-4 block">👋</span>
@@ -28,3 +28,8 @@ class User(AbstractUser):
 
     class Meta:
         db_table = 'users'
+        indexes = [
+            models.Index(fields=['date_joined'], name='user_date_joined_idx'),
+            # Staff are a handful of rows; counted on the dashboard and emailed on sign-ups
+            models.Index(fields=['date_joined'], name='user_staff_idx', condition=models.Q(is_staff=True)),
+        ]
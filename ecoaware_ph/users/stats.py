@@ -0,0 +1,101 @@
+from django.conf import settings
+from django.db import connection
+from django.db.models import Func, IntegerField, Value
+
+from core import analytics
+from core.cache import cached
+
+from .models import User
+
+
+# =========================================================
+# ADMIN DASHBOARD STATS
+# =========================================================
+# The dashboard is a snapshot: every counter comes from one SELECT of
+# scalar subqueries, the recent lists load their related rows with
+# select_related, and the whole result is cached for
+# ADMIN_DASHBOARD_TTL seconds. Staff refreshing the page within the TTL
+# cost no queries at all; acting on a suggestion invalidates the
+# "dashboard" namespace (core.signals) so its new status shows at once.
+# Other changes appear when the snapshot expires.
+#
+# The 30-day activity chart reads the site-wide daily series from
+# core.analytics, one query for both metrics.
+
+ACTIVITY_DAYS = 30
+
+
+def _count_sql(queryset):
+    # COUNT as a plain function, so the ORM doesn't add a GROUP BY
+    count = Func(Value(1), function='COUNT', output_field=IntegerField())
+    return queryset.order_by().annotate(n=count).values('n').query.sql_with_params()
+
+
+def counters():
+    """Site-wide totals for the dashboard, in one round trip."""
+    from articles.models import Article
+    from campaigns.models import Campaign
+
+    querysets = {
+        'total_users': User.objects.all(),
+        'total_articles': Article.objects.all(),
+        'total_campaigns': Campaign.objects.all(),
+        'admin_users': User.objects.filter(is_staff=True),
+    }
+    columns, params = [], []
+    for sql, query_params in map(_count_sql, querysets.values()):
+        columns.append(f'({sql})')
+        params.extend(query_params)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT ' + ', '.join(columns), params)
+        row = cursor.fetchone()
+    return dict(zip(querysets, row))
+
+
+def activity_chart(days=ACTIVITY_DAYS):
+    """Daily article views and campaign joins, with bar heights as a percentage of each metric's peak."""
+    series = analytics.daily_series([analytics.ARTICLE_VIEWS, analytics.CAMPAIGN_JOINS], days=days)
+    views, joins = series[analytics.ARTICLE_VIEWS], series[analytics.CAMPAIGN_JOINS]
+    peak_views = max(count for day, count in views) or 1
+    peak_joins = max(count for day, count in joins) or 1
+    return [
+        {
+            'date': day,
+            'views': view_count,
+            'joins': join_count,
+            'views_height': round(view_count * 100 / peak_views),
+            'joins_height': round(join_count * 100 / peak_joins),
+        }
+        for (day, view_count), (_, join_count) in zip(views, joins)
+    ]
+
+
+def build_admin_snapshot():
+    from articles.models import Article
+    from campaigns.models import Campaign, CampaignSuggestion
+
+    return {
+        **counters(),
+        'activity': activity_chart(),
+        'activity_days': ACTIVITY_DAYS,
+        'recent_articles': list(
+            Article.objects.select_related('author')
+            .only('title', 'slug', 'created_at', 'author__username')
+            .order_by('-created_at')[:5]
+        ),
+        'recent_campaigns': list(Campaign.objects.only('title', 'created_at').order_by('-created_at')[:5]),
+        # The snapshot is pickled into the cache; leave password hashes out of it
+        'recent_users': list(
+            User.objects.only('username', 'email', 'is_staff', 'is_active', 'date_joined').order_by('-date_joined')[:5]
+        ),
+        'suggestions': list(
+            CampaignSuggestion.objects.select_related('user')
+            .defer('description', 'user__password')
+            .order_by('-created_at')[:10]
+        ),
+    }
+
+
+def admin_snapshot():
+    """The admin dashboard's context, rebuilt at most once per ADMIN_DASHBOARD_TTL."""
+    return cached('dashboard', 'admin', build_admin_snapshot, timeout=settings.ADMIN_DASHBOARD_TTL)
@@ -0,0 +1,19 @@
+import logging
+
+from django.contrib.auth import get_user_model
+
+from core.jobs import task
+
+logger = logging.getLogger(__name__)
+
+
+# =========================================================
+# BACKGROUND JOBS (run by `manage.py runworker`)
+# =========================================================
+@task(priority=120)
+def notify_new_user(user_id):
+    """Log a new sign-up"""
+    user = get_user_model().objects.filter(pk=user_id).first()
+    if user is None:
+        return
+    logger.info('New user created: %s with role: %s', user.username, user.role)
@@ -51,18 +51,17 @@ def user_logout(request):
 @login_required
 def user_dashboard(request):
     try:
-        from articles.models import Article
-        from campaigns.models import Campaign
+        from articles.models import Article, AuthorStats
         
         # Get user's articles
-        user_articles = Article.objects.filter(author=request.user).order_by('-created_at')[:5]
-        total_articles = Article.objects.filter(author=request.user).count()
+        user_articles = Article.objects.filter(author=request.user).defer('content').order_by('-created_at')[:5]
+        stats = AuthorStats.for_author(request.user)
         
         context = {
             'user_articles': user_articles,
-            'total_articles': total_articles,
-            'total_views': sum(article.views for article in Article.objects.filter(author=request.user)),
-            'impact_points': sum(article.views for article in Article.objects.filter(author=request.user)) + total_articles,
+            'total_articles': stats.article_count,
+            'total_views': stats.total_views,
+            'impact_points': stats.impact_points,
         }
     except:
         context = {}
@@ -76,19 +75,9 @@ def admin_dashboard(request):
         return redirect('users:access_denied')
     
     try:
-        from articles.models import Article
-        from campaigns.models import Campaign, CampaignSuggestion
-        
-        context = {
-            'total_users': User.objects.count(),
-            'total_articles': Article.objects.count(),
-            'total_campaigns': Campaign.objects.count(),
-            'admin_users': User.objects.filter(is_staff=True).count(),
-            'recent_articles': Article.objects.order_by('-created_at')[:5],
-            'recent_campaigns': Campaign.objects.order_by('-created_at')[:5],
-            'recent_users': User.objects.order_by('-date_joined')[:5],
-            'suggestions': CampaignSuggestion.objects.order_by('-created_at')[:10],
-        }
+        from .stats import admin_snapshot
+
+        context = admin_snapshot()
     except:
         context = {}
         
@@ -156,12 +145,10 @@ def user_profile(request, username):
     
     # Calculate stats
     try:
-        from articles.models import Article
-        user_articles_qs = Article.objects.filter(author=profile_user)
-        total_articles = user_articles_qs.count()
-        # Sum views, defaulting to 0 if no articles
-        total_views = sum(a.views for a in user_articles_qs)
-        impact_points = total_views + total_articles
+        from articles.models import AuthorStats
+        stats = AuthorStats.for_author(profile_user)
+        total_articles = stats.article_count
+        impact_points = stats.impact_points
     except Exception:
         total_articles = 0
         impact_points = 0